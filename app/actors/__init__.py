@@ -0,0 +1,7 @@
+# Workers run ``dramatiq app.actors``: the broker must be set before any
+# actor is declared, then every actor module is imported to register it
+from ..core.broker import broker
+from .clear_expired_authorizations import clear_expired_authorizations
+from .send_verification_key import send_verification_key
+
+__all__ = ["broker", "clear_expired_authorizations", "send_verification_key"]
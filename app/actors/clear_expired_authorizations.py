@@ -1,8 +1,48 @@
-from ..repositories.user import UserRepository
+import logging
+import time
 
+import dramatiq
 
-def clear_expired_authorizations(user_repository=UserRepository()):
-    expired_users = user_repository.find_expired_authorizations()
+from ..core.config import settings
+from ..core.metrics import MAINTENANCE_JOB_DURATION, MAINTENANCE_JOB_RUNS
+from ..repositories.user import SyncUserRepository
 
-    if expired_users:
-        user_repository.delete_many(expired_users)
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "clear_expired_authorizations"
+
+
+# Not retried: the next scheduled run picks up whatever is left
+@dramatiq.actor(queue_name="maintenance", max_retries=0)
+def clear_expired_authorizations(
+    user_repository: SyncUserRepository = SyncUserRepository(),
+) -> int:
+    started_at = time.perf_counter()
+    deleted = 0
+
+    try:
+        while True:
+            batch_deleted = user_repository.delete_expired_authorizations(
+                expires_after=settings.UNVERIFIED_USER_EXPIRATION,
+                batch_size=settings.PURGE_BATCH_SIZE,
+            )
+            deleted += batch_deleted
+
+            if batch_deleted < settings.PURGE_BATCH_SIZE:
+                break
+    except Exception:
+        MAINTENANCE_JOB_RUNS.labels(JOB_NAME, "failure").inc()
+        raise
+    finally:
+        MAINTENANCE_JOB_DURATION.labels(JOB_NAME).observe(
+            time.perf_counter() - started_at
+        )
+
+    MAINTENANCE_JOB_RUNS.labels(JOB_NAME, "success").inc()
+    logger.info(
+        "Cleared %d expired authorizations in %.3fs",
+        deleted,
+        time.perf_counter() - started_at,
+    )
+
+    return deleted
@@ -0,0 +1,25 @@
+import logging
+
+import dramatiq
+
+from ..core.config import settings
+from ..repositories.user import SyncUserRepository
+
+logger = logging.getLogger(__name__)
+
+
+@dramatiq.actor(max_retries=settings.VERIFICATION_MAX_RETRIES)
+def send_verification_key(
+    user_id: str,
+    user_repository: SyncUserRepository = SyncUserRepository(),
+) -> None:
+    # The key is read back from the database rather than carried in the
+    # message, and nothing is sent once the user is verified or purged
+    pending = user_repository.get_pending_verification(user_id)
+
+    if pending is None:
+        return
+
+    email, verification_key = pending
+
+    logger.info("New user signed up: %s, verification key: %s", email, verification_key)
@@ -0,0 +1,70 @@
+"""Add indexes for the admin user list filters
+
+Revision ID: 3f8d2c6b1e4a
+Revises: 7c1e5f2a9b3d
+Create Date: 2026-10-17 14:03:27.918204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f8d2c6b1e4a'
+down_revision = '7c1e5f2a9b3d'
+branch_labels = None
+depends_on = None
+
+TRIGRAM_COLUMNS = ('email', 'first_name', 'last_name')
+
+
+def upgrade():
+    # pg_trgm ships with Postgres but creating it needs CREATE on the database
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # Built concurrently so the users table stays writable during the migration
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_created_at',
+            'users',
+            ['created_at'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_users_admin_id',
+            'users',
+            ['id'],
+            postgresql_where=sa.text('is_admin'),
+            postgresql_concurrently=True,
+        )
+
+        for column in TRIGRAM_COLUMNS:
+            op.create_index(
+                f'ix_users_lower_{column}_trgm',
+                'users',
+                [sa.text(f'lower({column}) gin_trgm_ops')],
+                postgresql_using='gin',
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade():
+    # The extension is left installed; other objects may depend on it
+    with op.get_context().autocommit_block():
+        for column in reversed(TRIGRAM_COLUMNS):
+            op.drop_index(
+                f'ix_users_lower_{column}_trgm',
+                table_name='users',
+                postgresql_concurrently=True,
+            )
+
+        op.drop_index(
+            'ix_users_admin_id',
+            table_name='users',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_users_created_at',
+            table_name='users',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,50 @@
+"""Add lower(email) and unverified expiry indexes
+
+Revision ID: 7c1e5f2a9b3d
+Revises: 04a0687ad4f3
+Create Date: 2026-10-17 10:12:45.301527
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e5f2a9b3d'
+down_revision = '04a0687ad4f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built concurrently so the users table stays writable during the migration.
+    # Fails if emails differing only by case already exist; merge those first.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_email_lower',
+            'users',
+            [sa.text('lower(email)')],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_users_unverified_created_at',
+            'users',
+            ['created_at'],
+            postgresql_where=sa.text('verified = false'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_users_unverified_created_at',
+            table_name='users',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_users_email_lower',
+            table_name='users',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,36 @@
+"""Dramatiq broker shared by the API (producer) and ``dramatiq app.actors``.
+
+``BROKER=redis`` (the default) queues messages in ``BROKER_URL`` so any
+number of worker processes can consume them; ``BROKER=stub`` keeps them in
+memory for tests and scripts that drain the queue themselves.
+"""
+
+import dramatiq
+from dramatiq.brokers.redis import RedisBroker
+from dramatiq.brokers.stub import StubBroker
+from dramatiq.errors import BrokerError
+from dramatiq.middleware.prometheus import Prometheus
+from redis.exceptions import RedisError
+
+from .config import settings
+
+# Raised by ``Actor.send`` when the message could not be enqueued
+BROKER_ERRORS = (BrokerError, RedisError, OSError)
+
+
+def create_broker() -> dramatiq.Broker:
+    if settings.BROKER == "stub":
+        return StubBroker()  # type: ignore[no-untyped-call]
+
+    broker = RedisBroker(url=settings.BROKER_URL)  # type: ignore[no-untyped-call]
+
+    if settings.METRICS_ENABLED:
+        # Workers serve Dramatiq's and the actors' metrics on port 9191 when
+        # PROMETHEUS_MULTIPROC_DIR is the same directory as dramatiq_prom_db
+        broker.add_middleware(Prometheus())  # type: ignore[no-untyped-call]
+
+    return broker
+
+
+broker = create_broker()
+dramatiq.set_broker(broker)
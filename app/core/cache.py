@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+
+from .metrics import CACHE_ENTRIES, CACHE_EVICTIONS, CACHE_REQUESTS
+
+
+class TTLCache[K, V]:
+    """Bounded in-process LRU cache whose entries also expire after ``ttl`` seconds.
+
+    The cache is per process: with several workers an invalidation only
+    reaches the worker that issued it, so ``ttl`` bounds how stale the
+    other workers can be. ``maxsize=0`` disables caching.
+
+    With a ``name`` the hit, miss and eviction counts and the size are also
+    exported as Prometheus metrics labelled with it.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, name: str | None = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._data[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+
+            size = len(self._data)
+
+        if self.name is not None:
+            CACHE_REQUESTS.labels(self.name, "miss" if entry is None else "hit").inc()
+            CACHE_ENTRIES.labels(self.name).set(size)
+
+        return None if entry is None else entry[1]
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        if self.maxsize <= 0:
+            return
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        evicted = 0
+
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                evicted += 1
+
+            self.evictions += evicted
+            size = len(self._data)
+
+        if self.name is not None:
+            if evicted:
+                CACHE_EVICTIONS.labels(self.name).inc(evicted)
+
+            CACHE_ENTRIES.labels(self.name).set(size)
+
+    def invalidate(self, key: K) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
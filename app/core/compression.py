@@ -0,0 +1,251 @@
+"""Response compression negotiated from ``Accept-Encoding``.
+
+zstd and brotli are used when their optional packages (``zstandard``,
+``brotli``) are installed; gzip is always available. Streaming bodies are
+compressed chunk by chunk and flushed after each one, never buffered whole.
+"""
+
+import zlib
+from typing import Protocol, cast
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None  # type: ignore[assignment]
+
+try:
+    import brotli  # type: ignore[import-untyped]
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+BODILESS_STATUSES = frozenset((204, 304))
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes:
+        """Emit everything compressed so far; the stream stays open"""
+        ...
+
+    def finish(self) -> bytes: ...
+
+
+class GzipCompressor:
+    def __init__(self, level: int) -> None:
+        # wbits=31: gzip container rather than a raw zlib stream
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor:
+    def __init__(self, level: int) -> None:
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return cast(bytes, self._compressor.process(data))
+
+    def flush(self) -> bytes:
+        return cast(bytes, self._compressor.flush())
+
+    def finish(self) -> bytes:
+        return cast(bytes, self._compressor.finish())
+
+
+class ZstdCompressor:
+    def __init__(self, level: int) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Supported encodings, most preferred first"""
+    encodings = []
+
+    if zstandard is not None:
+        encodings.append("zstd")
+
+    if brotli is not None:
+        encodings.append("br")
+
+    encodings.append("gzip")
+
+    return tuple(encodings)
+
+
+def negotiate_encoding(accept_encoding: str, encodings: tuple[str, ...]) -> str | None:
+    """Pick the client's highest-q encoding we support; ties go to ``encodings`` order"""
+    weights: dict[str, float] = {}
+
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+
+        weights[name.strip().lower()] = q
+
+    wildcard = weights.get("*", 0.0)
+    candidates = [
+        (weights.get(encoding, wildcard), -i, encoding)
+        for i, encoding in enumerate(encodings)
+    ]
+    q, _, encoding = max(candidates)
+
+    return encoding if q > 0 else None
+
+
+class CompressionMiddleware:
+    """Pure ASGI so streamed bodies are compressed as they are sent"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings()
+        self.levels = {"zstd": zstd_level, "br": brotli_quality, "gzip": gzip_level}
+
+    def _compressor(self, encoding: str) -> Compressor:
+        level = self.levels[encoding]
+
+        if encoding == "zstd":
+            return ZstdCompressor(level)
+
+        if encoding == "br":
+            return BrotliCompressor(level)
+
+        return GzipCompressor(level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = negotiate_encoding(
+            request_headers.get("accept-encoding", ""), self.encodings
+        )
+
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message | None = None
+        compressor: Compressor | None = None
+        # Responses without a body (HEAD, 1xx, 204, 304) are never encoded
+        has_body = scope["method"] != "HEAD"
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, compressor
+
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows whether to compress
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not None:
+                start, start_message = start_message, None
+                headers = MutableHeaders(raw=start["headers"])
+
+                if "content-encoding" in headers:
+                    await send(start)
+                    await send(message)
+                    return
+
+                # Whether the body is encoded depends on Accept-Encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                status = start["status"]
+
+                if (
+                    not has_body
+                    or status < 200
+                    or status in BODILESS_STATUSES
+                    or (not more_body and len(body) < self.minimum_size)
+                ):
+                    # A 304 repeats the validator the client holds, which is
+                    # the weak one if its copy was encoded
+                    if (
+                        status == 304
+                        and etag
+                        and not etag.startswith("W/")
+                        and f"W/{etag}" in request_headers.get("if-none-match", "")
+                    ):
+                        headers["ETag"] = f"W/{etag}"
+
+                    await send(start)
+                    await send(message)
+                    return
+
+                # Encoded bytes are not the identity representation, so their
+                # validator is weak; If-None-Match comparison is weak anyway
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+
+                compressor = self._compressor(encoding)
+                headers["Content-Encoding"] = encoding
+
+                if more_body:
+                    del headers["content-length"]
+                else:
+                    body = compressor.compress(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(body))
+
+                    await send(start)
+                    await send({**message, "body": body})
+                    return
+
+                await send(start)
+
+            if compressor is None:
+                await send(message)
+                return
+
+            if more_body:
+                body = compressor.compress(body) + compressor.flush()
+            else:
+                body = compressor.compress(body) + compressor.finish()
+
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_wrapper)
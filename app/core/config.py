@@ -1,3 +1,5 @@
+import os
+from datetime import timedelta
 from typing import Literal
 
 from pydantic import PostgresDsn, computed_field
@@ -14,16 +16,102 @@ class Settings(BaseSettings):
     ALL_CORS_ORIGINS: list[str] = []
 
     SENTRY_DSN: str | None = None
+    METRICS_ENABLED: bool = True
     ENVIRONMENT: Literal["development", "production"] = "development"
 
     SECRET_KEY: str
 
+    # Responses of at least COMPRESSION_MINIMUM_SIZE bytes (and every stream)
+    # are compressed with zstd, brotli or gzip, whichever the client prefers
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+
+    # Production server (app/server.py); 0 workers means one per available core
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEPALIVE_TIMEOUT: int = 5
+    SERVER_GRACEFUL_SHUTDOWN_TIMEOUT: int = 30
+    SERVER_LIMIT_CONCURRENCY: int | None = None
+    SERVER_FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+    SERVER_ACCESS_LOG: bool = False
+
+    # Policy for new hashes; tune the cost with `python -m app.core.passwords`.
+    # Hashes made under another policy are upgraded on the next login
+    PASSWORD_HASH_ALGORITHM: Literal["bcrypt", "argon2"] = "bcrypt"
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+
+    # bcrypt releases the GIL, so password work runs on a thread pool. Sizes
+    # are per process: unless set explicitly, app.server divides both by
+    # SERVER_WORKERS so the server as a whole has one thread per core
+    PASSWORD_HASH_WORKERS: int = os.process_cpu_count() or 1
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+
+    # Look the email up before hashing so duplicates skip bcrypt; the INSERT
+    # still rejects duplicates on its own when disabled
+    SIGNUP_EMAIL_PRECHECK: bool = True
+
+    # Token buckets for login/signup, per client IP and per email
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_REDIS_URL: str | None = None
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    AUTH_RATE_LIMIT_PER_IP: int = 20
+    AUTH_RATE_LIMIT_PER_EMAIL: int = 5
+    AUTH_RATE_LIMIT_WINDOW: float = 60.0
+
+    # Background jobs (app/actors); "stub" keeps messages in memory for tests
+    BROKER: Literal["redis", "stub"] = "redis"
+    BROKER_URL: str = "redis://localhost:6379/0"
+    VERIFICATION_MAX_RETRIES: int = 5
+
+    # Authenticated user lookups, cached per process (0 disables the cache)
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+    PRINCIPAL_CACHE_TTL: float = 30.0
+    # Already-verified bearer tokens, each kept until its own expiry
+    TOKEN_CACHE_SIZE: int = 10_000
+
+    # Unverified accounts older than this are purged in batches
+    UNVERIFIED_USER_EXPIRATION: timedelta = timedelta(days=2)
+    PURGE_BATCH_SIZE: int = 1000
+    PURGE_SCHEDULE: str = "*/5 * * * *"
+
+    # Scheduler replicas elect one leader; each serves its metrics on this port
+    SCHEDULER_METRICS_PORT: int = 9100
+
     POSTGRES_HOST: str = "localhost"
     POSTGRES_PORT: int = 5432
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str = ""
     POSTGRES_DB: str
 
+    # Optional read replicas; read-only repository queries are spread across them
+    POSTGRES_REPLICA_DSNS: list[PostgresDsn] = []
+    # Seconds a failed replica is skipped before it is tried again
+    REPLICA_RETRY_AFTER: float = 30.0
+    # Seconds after a write during which that user is read from the primary,
+    # by the worker process that wrote it
+    REPLICA_READ_YOUR_WRITES_WINDOW: float = 10.0
+
+    # Connection pool, per engine and per process
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Seconds to wait for a free connection before failing the request
+    DB_POOL_TIMEOUT: float = 3.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_CONNECT_TIMEOUT: int = 5
+
+    # Server-side limits applied to every session, in milliseconds (0 disables)
+    DB_STATEMENT_TIMEOUT_MS: int = 5000
+    DB_LOCK_TIMEOUT_MS: int = 2000
+
     @computed_field
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> PostgresDsn:
@@ -36,5 +124,17 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    @computed_field
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> PostgresDsn:
+        return PostgresDsn.build(
+            scheme="postgresql+asyncpg",
+            username=self.POSTGRES_USER,
+            password=self.POSTGRES_PASSWORD,
+            host=self.POSTGRES_HOST,
+            port=self.POSTGRES_PORT,
+            path=self.POSTGRES_DB,
+        )
+
 
 settings = Settings()  # type: ignore
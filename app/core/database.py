@@ -1,23 +1,126 @@
-from collections.abc import Generator
-from contextlib import contextmanager
+import itertools
+import time
+from collections.abc import AsyncGenerator, Generator
+from contextlib import asynccontextmanager, contextmanager
+from typing import Annotated, Any
 
-from sqlalchemy.engine import create_engine
+from fastapi import Depends
+from sqlalchemy.engine import URL, Engine, create_engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, scoped_session, sessionmaker
 
 from .config import settings
+from .metrics import instrument_engine
 
 # Cache scoped session
 __session_factory: scoped_session | None = None
 
+# Cache async session factory
+__async_session_factory: async_sessionmaker[AsyncSession] | None = None
+
+# Cache read replica set
+__replica_set: "ReplicaSet | None" = None
+
+
+def _pool_options() -> dict[str, Any]:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def _server_settings() -> dict[str, str]:
+    return {
+        "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS),
+        "lock_timeout": str(settings.DB_LOCK_TIMEOUT_MS),
+    }
+
+
+def create_sync_engine(url: str) -> Engine:
+    options = " ".join(f"-c {key}={value}" for key, value in _server_settings().items())
+
+    return create_engine(
+        url,
+        echo=False,
+        connect_args={
+            "connect_timeout": settings.DB_CONNECT_TIMEOUT,
+            "options": options,
+        },
+        **_pool_options(),
+    )
+
+
+def create_asyncpg_engine(url: str | URL) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=False,
+        connect_args={
+            "timeout": settings.DB_CONNECT_TIMEOUT,
+            "server_settings": _server_settings(),
+        },
+        **_pool_options(),
+    )
+
+
+def pool_status(engine: Engine | AsyncEngine) -> dict[str, int]:
+    pool = engine.pool
+
+    return {
+        "size": pool.size(),  # type: ignore[attr-defined]
+        "checked_in": pool.checkedin(),  # type: ignore[attr-defined]
+        "checked_out": pool.checkedout(),  # type: ignore[attr-defined]
+        "overflow": max(pool.overflow(), 0),  # type: ignore[attr-defined]
+    }
+
+
+def get_pool_statuses() -> dict[str, dict[str, int]]:
+    """Occupancy of every engine created so far in this process"""
+    statuses = {}
+
+    if __async_session_factory is not None:
+        statuses["primary"] = pool_status(__async_session_factory.kw["bind"])
+
+    if __session_factory is not None:
+        statuses["primary_sync"] = pool_status(
+            __session_factory.session_factory.kw["bind"]
+        )
+
+    if __replica_set is not None:
+        for name, factory in __replica_set.factories.items():
+            statuses[name] = pool_status(factory.kw["bind"])
+
+    return statuses
+
+
+async def dispose_async_engine() -> None:
+    """Close pooled connections once in-flight requests have drained"""
+    global __async_session_factory, __replica_set
+
+    if __async_session_factory is not None:
+        await __async_session_factory.kw["bind"].dispose()
+        __async_session_factory = None
+
+    if __replica_set is not None:
+        for factory in __replica_set.factories.values():
+            await factory.kw["bind"].dispose()
+
+        __replica_set = None
+
 
 def get_session_factory() -> scoped_session[Session]:
     global __session_factory
 
     if __session_factory is None:
-        engine = create_engine(
-            str(settings.SQLALCHEMY_DATABASE_URI),
-            echo=False,
-        )
+        engine = create_sync_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+        instrument_engine(engine, pool_name="primary_sync")
 
         __session_factory = scoped_session(
             sessionmaker(
@@ -30,6 +133,76 @@ def get_session_factory() -> scoped_session[Session]:
     return __session_factory
 
 
+def get_async_session_factory() -> async_sessionmaker[AsyncSession]:
+    global __async_session_factory
+
+    if __async_session_factory is None:
+        engine = create_asyncpg_engine(str(settings.SQLALCHEMY_ASYNC_DATABASE_URI))
+        instrument_engine(engine.sync_engine, pool_name="primary")
+
+        __async_session_factory = async_sessionmaker(
+            bind=engine,
+            autoflush=False,
+            # Handlers keep using loaded objects after an explicit commit
+            expire_on_commit=False,
+        )
+
+    return __async_session_factory
+
+
+class ReplicaSet:
+    """Round-robin over replica session factories, skipping recently failed ones"""
+
+    def __init__(
+        self,
+        factories: dict[str, async_sessionmaker[AsyncSession]],
+        retry_after: float,
+    ) -> None:
+        self.factories = factories
+        self.retry_after = retry_after
+
+        self._names = itertools.cycle(factories)
+        self._down_until = dict.fromkeys(factories, 0.0)
+
+    def choose(self) -> str | None:
+        now = time.monotonic()
+
+        for _ in range(len(self.factories)):
+            name = next(self._names)
+
+            if self._down_until[name] <= now:
+                return name
+
+        return None
+
+    def mark_failed(self, name: str) -> None:
+        self._down_until[name] = time.monotonic() + self.retry_after
+
+
+def get_replica_set() -> ReplicaSet:
+    global __replica_set
+
+    if __replica_set is None:
+        factories = {}
+
+        for i, dsn in enumerate(settings.POSTGRES_REPLICA_DSNS):
+            name = f"replica_{i}"
+            engine = create_asyncpg_engine(
+                make_url(str(dsn)).set(drivername="postgresql+asyncpg")
+            )
+            instrument_engine(engine.sync_engine, pool_name=name)
+
+            factories[name] = async_sessionmaker(
+                bind=engine,
+                autoflush=False,
+                expire_on_commit=False,
+            )
+
+        __replica_set = ReplicaSet(factories, retry_after=settings.REPLICA_RETRY_AFTER)
+
+    return __replica_set
+
+
 @contextmanager
 def session() -> Generator[Session]:
     _session_factory = get_session_factory()
@@ -42,3 +215,49 @@ def session() -> Generator[Session]:
         raise
     finally:
         _session.close()
+
+
+@asynccontextmanager
+async def async_session() -> AsyncGenerator[AsyncSession]:
+    _session_factory = get_async_session_factory()
+
+    async with _session_factory() as _session:
+        try:
+            yield _session
+        except Exception:
+            await _session.rollback()
+            raise
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession]:
+    """One session per request, shared by every dependency that asks for it.
+
+    Nothing is committed implicitly: handlers commit their unit of work, and
+    anything left pending is rolled back when the request ends.
+    """
+    async with async_session() as _session:
+        yield _session
+
+
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
+
+
+async def get_replica_session() -> AsyncGenerator[AsyncSession | None]:
+    """Request-scoped session on the next healthy replica, if any are configured.
+
+    The replica's name is kept in ``session.info["replica"]`` so callers can
+    report it as failed. No connection is checked out until the first query.
+    """
+    replica_set = get_replica_set()
+    name = replica_set.choose()
+
+    if name is None:
+        yield None
+        return
+
+    async with replica_set.factories[name]() as _session:
+        _session.info["replica"] = name
+        yield _session
+
+
+ReplicaSessionDep = Annotated[AsyncSession | None, Depends(get_replica_session)]
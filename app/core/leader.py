@@ -0,0 +1,85 @@
+"""Leader election for processes that may run as several replicas.
+
+The leader holds a session-level Postgres advisory lock on a connection it
+keeps out of the pool. If the process dies or its connection drops, Postgres
+releases the lock and another replica takes over at its next check.
+"""
+
+import logging
+import zlib
+
+from sqlalchemy import Connection, text
+from sqlalchemy.exc import DBAPIError
+
+from .database import get_session_factory
+
+logger = logging.getLogger(__name__)
+
+
+class AdvisoryLockLeader:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        # Advisory locks take a bigint key; a stable hash keeps names readable
+        self.lock_id = zlib.crc32(name.encode())
+
+        self._connection: Connection | None = None
+
+    def is_leader(self) -> bool:
+        """Confirm the lease is still held, or try to take it"""
+        if self._connection is not None:
+            try:
+                self._connection.execute(text("SELECT 1"))
+                return True
+            except DBAPIError:
+                logger.warning("Lost leadership of %s", self.name, exc_info=True)
+                self._close()
+
+        engine = get_session_factory().session_factory.kw["bind"]
+
+        try:
+            # Autocommit: a lease held for hours must not sit idle in a transaction
+            connection = engine.connect().execution_options(
+                isolation_level="AUTOCOMMIT"
+            )
+        except DBAPIError:
+            logger.warning("Could not reach the database", exc_info=True)
+            return False
+
+        try:
+            acquired = connection.execute(
+                text("SELECT pg_try_advisory_lock(:lock_id)"),
+                {"lock_id": self.lock_id},
+            ).scalar_one()
+        except DBAPIError:
+            logger.warning("Could not reach the database", exc_info=True)
+            connection.close()
+            return False
+
+        if not acquired:
+            connection.close()
+            return False
+
+        # The lock lives as long as the session: never hand it back to the pool
+        connection.detach()
+        self._connection = connection
+        logger.info("Became leader of %s", self.name)
+
+        return True
+
+    def release(self) -> None:
+        if self._connection is None:
+            return
+
+        try:
+            self._connection.execute(
+                text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": self.lock_id}
+            )
+        except DBAPIError:
+            pass
+
+        self._close()
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
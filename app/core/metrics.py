@@ -0,0 +1,263 @@
+"""Prometheus metrics for routes, the database pool, password hashing and jobs.
+
+With several worker processes set ``PROMETHEUS_MULTIPROC_DIR`` to an empty,
+writable directory before the workers start; ``/metrics`` then aggregates
+the samples written by every process.
+"""
+
+import glob
+import os
+import time
+from typing import Any
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext
+from sqlalchemy.pool import Pool
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Duration of SQL statements, counted per statement",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts",
+    "Connections checked out of the pool",
+    ["pool"],
+)
+
+DB_POOL_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "Connections currently checked out of the pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Connections open beyond the configured pool size",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "Time spent in bcrypt, excluding time queued for a worker",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2, 5),
+)
+
+WORKER_POOL_QUEUE_DEPTH = Gauge(
+    "worker_pool_queue_depth",
+    "Calls waiting for a free worker thread",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+WORKER_POOL_REJECTED = Counter(
+    "worker_pool_rejected",
+    "Calls rejected because the worker pool backlog was full",
+    ["pool"],
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests",
+    "In-process cache lookups by result (hit, miss)",
+    ["cache", "result"],
+)
+
+CACHE_EVICTIONS = Counter(
+    "cache_evictions",
+    "Entries evicted to keep an in-process cache within its size",
+    ["cache"],
+)
+
+CACHE_ENTRIES = Gauge(
+    "cache_entries",
+    "Entries held by an in-process cache, summed over workers",
+    ["cache"],
+    multiprocess_mode="livesum",
+)
+
+RATE_LIMIT_HITS = Counter(
+    "rate_limit_hits",
+    "Requests rejected by the auth rate limiter",
+    ["route", "key_type"],
+)
+
+SCHEDULED_JOB_RUNS = Counter(
+    "scheduled_job_runs",
+    "Scheduler ticks by outcome (enqueued, failure to enqueue, skipped when not leader)",
+    ["job", "outcome"],
+)
+
+MAINTENANCE_JOB_DURATION = Histogram(
+    "maintenance_job_duration_seconds",
+    "Duration of maintenance actors on the Dramatiq workers",
+    ["job"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 120, 300),
+)
+
+MAINTENANCE_JOB_RUNS = Counter(
+    "maintenance_job_runs",
+    "Maintenance actor runs by outcome (success, failure)",
+    ["job", "outcome"],
+)
+
+
+def get_registry() -> CollectorRegistry:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+        return registry
+
+    return REGISTRY
+
+
+def mark_dead_processes() -> None:
+    """Drop the live gauge samples of worker processes that no longer exist.
+
+    Run when a worker starts, which is also when the supervisor replaces one
+    that died without reaching its own shutdown.
+    """
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+    if path is None:
+        return
+
+    for filename in glob.glob(os.path.join(path, "gauge_live*_*.db")):
+        pid = int(filename.rsplit("_", 1)[1].removesuffix(".db"))
+
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            multiprocess.mark_process_dead(pid, path)  # type: ignore[no-untyped-call]
+        except PermissionError:
+            pass
+
+
+def mark_process_dead() -> None:
+    """Drop this process's live gauge samples on shutdown"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())  # type: ignore[no-untyped-call]
+
+
+def render_metrics() -> tuple[bytes, str]:
+    return generate_latest(get_registry()), CONTENT_TYPE_LATEST
+
+
+def instrument_engine(engine: Engine, pool_name: str) -> None:
+    """Record statement durations and pool occupancy for ``engine``"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn: Connection, *_: Any) -> None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn: Connection, *_: Any) -> None:
+        started_at = conn.info["query_started_at"].pop()
+        DB_QUERY_DURATION.labels(pool_name).observe(time.perf_counter() - started_at)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context: ExceptionContext) -> None:
+        conn = exception_context.connection
+
+        if conn is not None and conn.info.get("query_started_at"):
+            conn.info["query_started_at"].pop()
+
+    pool: Pool = engine.pool
+
+    def record_overflow() -> None:
+        overflow = getattr(pool, "overflow", None)
+
+        if overflow is not None:
+            DB_POOL_OVERFLOW.labels(pool_name).set(max(overflow(), 0))
+
+    @event.listens_for(pool, "checkout")
+    def checkout(*_: Any) -> None:
+        DB_POOL_CHECKOUTS.labels(pool_name).inc()
+        DB_POOL_IN_USE.labels(pool_name).inc()
+        record_overflow()
+
+    @event.listens_for(pool, "checkin")
+    def checkin(*_: Any) -> None:
+        DB_POOL_IN_USE.labels(pool_name).dec()
+        record_overflow()
+
+
+def _route_template(scope: Scope) -> str:
+    route = scope.get("route")
+
+    if route is None:
+        # Older Starlette versions do not record the matched route on the scope
+        for candidate in scope["app"].router.routes:
+            match, _ = candidate.matches(scope)
+
+            if match == Match.FULL:
+                route = candidate
+                break
+
+    template = getattr(route, "path", None)
+
+    if template is None:
+        # Unmatched paths share one label so scanners cannot blow up cardinality
+        return "unmatched"
+
+    # Routes of nested routers only know their own path; the leading segments
+    # of the request path are the (literal) router prefixes
+    template_segments = template.strip("/").split("/")
+    path_segments = scope["path"].strip("/").split("/")
+    prefix = path_segments[: max(len(path_segments) - len(template_segments), 0)]
+
+    return "/" + "/".join(prefix + template_segments)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware so streaming bodies are timed to their last chunk"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started_at = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"],
+                _route_template(scope),
+                str(status_code),
+            ).observe(time.perf_counter() - started_at)
@@ -0,0 +1,157 @@
+"""Password hashing policy and host calibration.
+
+bcrypt is the default; ``PASSWORD_HASH_ALGORITHM=argon2`` switches new hashes
+to argon2id (``pip install -e ".[argon2]"``). Stored hashes of either kind
+keep verifying, and ``needs_rehash`` reports those made under an older
+policy so login can upgrade them.
+
+Recommend a cost for this host:
+
+    python -m app.core.passwords --target-ms 250
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from functools import cache, partial
+
+import bcrypt
+
+from .config import settings
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+except ImportError:  # pragma: no cover - optional dependency
+    PasswordHasher = None  # type: ignore[assignment,misc]
+
+ARGON2_PREFIX = "$argon2"
+
+
+@cache
+def _argon2_hasher(
+    time_cost: int, memory_cost: int, parallelism: int
+) -> "PasswordHasher":
+    if PasswordHasher is None:
+        raise RuntimeError("argon2 hashes need the argon2-cffi package")
+
+    return PasswordHasher(
+        time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+    )
+
+
+def argon2_hasher() -> "PasswordHasher":
+    return _argon2_hasher(
+        settings.ARGON2_TIME_COST,
+        settings.ARGON2_MEMORY_COST,
+        settings.ARGON2_PARALLELISM,
+    )
+
+
+def hash_password(password: str) -> str:
+    if settings.PASSWORD_HASH_ALGORITHM == "argon2":
+        return argon2_hasher().hash(password)
+
+    return bcrypt.hashpw(
+        password.encode("utf-8"),
+        bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS),
+    ).decode("utf-8")
+
+
+def check_password(password: str, hashed_password: str) -> bool:
+    # The algorithm is read off the stored hash, not the current policy
+    if hashed_password.startswith(ARGON2_PREFIX):
+        hasher = argon2_hasher()
+
+        try:
+            return hasher.verify(hashed_password, password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Whether the hash was made with another algorithm or cost than the policy"""
+    if settings.PASSWORD_HASH_ALGORITHM == "argon2":
+        return not hashed_password.startswith(
+            ARGON2_PREFIX
+        ) or argon2_hasher().check_needs_rehash(hashed_password)
+
+    if hashed_password.startswith(ARGON2_PREFIX):
+        return True
+
+    # $2b$<rounds>$<salt+hash>
+    return hashed_password.split("$")[2] != f"{settings.BCRYPT_ROUNDS:02d}"
+
+
+def _median_ms(run: Callable[[], object], samples: int) -> float:
+    timings = []
+
+    for _ in range(samples):
+        started_at = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started_at)
+
+    return statistics.median(timings) * 1000
+
+
+def calibrate(
+    algorithm: str, target_ms: float, samples: int
+) -> tuple[list[tuple[int, float]], int]:
+    """Time increasing costs until the target is clearly exceeded.
+
+    Returns the measurements and the highest cost whose median stays within
+    ``target_ms`` (the lowest measured cost if none does).
+    """
+    password = b"calibration-password"
+    measurements: list[tuple[int, float]] = []
+
+    for cost in range(4, 32) if algorithm == "bcrypt" else range(1, 64):
+        if algorithm == "bcrypt":
+            salt = bcrypt.gensalt(rounds=cost)
+            median_ms = _median_ms(partial(bcrypt.hashpw, password, salt), samples)
+        else:
+            hasher = _argon2_hasher(
+                cost, settings.ARGON2_MEMORY_COST, settings.ARGON2_PARALLELISM
+            )
+            median_ms = _median_ms(partial(hasher.hash, password), samples)
+
+        measurements.append((cost, median_ms))
+
+        if median_ms > target_ms:
+            break
+
+    within = [cost for cost, median_ms in measurements if median_ms <= target_ms]
+
+    return measurements, within[-1] if within else measurements[0][0]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Recommend a password hash cost for a target latency on this host"
+    )
+    parser.add_argument(
+        "--algorithm",
+        choices=("bcrypt", "argon2"),
+        default=settings.PASSWORD_HASH_ALGORITHM,
+    )
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    measurements, recommended = calibrate(args.algorithm, args.target_ms, args.samples)
+    setting = "BCRYPT_ROUNDS" if args.algorithm == "bcrypt" else "ARGON2_TIME_COST"
+
+    for cost, median_ms in measurements:
+        sys.stdout.write(f"{setting}={cost:<3} {median_ms:10.1f} ms\n")
+
+    sys.stdout.write(
+        f"\nRecommended for {args.target_ms:g} ms: {setting}={recommended}\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Token-bucket admission control for the CPU-heavy auth endpoints.
+
+Buckets hold ``limit`` tokens and refill at ``limit / window`` tokens per
+second. The in-memory backend is per process; set ``RATE_LIMIT_REDIS_URL``
+to share buckets between workers and replicas.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Protocol
+
+from fastapi import HTTPException, Request
+from fastapi import status as http_status
+
+from .config import settings
+from .metrics import RATE_LIMIT_HITS
+
+logger = logging.getLogger(__name__)
+
+# Cache rate limit backend
+__backend: "RateLimitBackend | None" = None
+
+
+class RateLimitBackend(Protocol):
+    async def hit(self, key: str, limit: int, window: float) -> float:
+        """Take one token; return 0 if allowed, else seconds until one is free"""
+        ...
+
+
+class MemoryRateLimitBackend:
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def hit(self, key: str, limit: int, window: float) -> float:
+        rate = limit / window
+        now = time.monotonic()
+
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (float(limit), now))
+            tokens = min(float(limit), tokens + (now - updated_at) * rate)
+
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+            else:
+                retry_after = (1 - tokens) / rate
+
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        return retry_after
+
+
+class RedisRateLimitBackend:
+    # Same bucket as the memory backend, updated atomically on the server
+    SCRIPT = """
+local limit = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or limit
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(limit, tokens + math.max(now - updated_at, 0) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(limit / rate * 1000))
+return tostring(retry_after)
+"""
+
+    def __init__(self, url: str) -> None:
+        from redis.asyncio import Redis
+
+        self._redis = Redis.from_url(url)
+        self._script = self._redis.register_script(self.SCRIPT)
+
+    async def hit(self, key: str, limit: int, window: float) -> float:
+        try:
+            retry_after = await self._script(
+                keys=[f"rate_limit:{key}"],
+                args=[limit, limit / window, time.time()],
+            )
+        except Exception:
+            # Fail open: an unavailable Redis must not lock every user out
+            logger.warning("Rate limit backend unavailable", exc_info=True)
+            return 0.0
+
+        return float(retry_after)
+
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    global __backend
+
+    if __backend is None:
+        if settings.RATE_LIMIT_REDIS_URL:
+            __backend = RedisRateLimitBackend(settings.RATE_LIMIT_REDIS_URL)
+        else:
+            __backend = MemoryRateLimitBackend(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+    return __backend
+
+
+def client_ip(request: Request) -> str:
+    # Behind a proxy uvicorn rewrites client from X-Forwarded-For for
+    # SERVER_FORWARDED_ALLOW_IPS
+    return request.client.host if request.client else "unknown"
+
+
+async def enforce_auth_rate_limit(request: Request, route: str, email: str) -> None:
+    """Reject the request with 429 when its IP or email is out of tokens.
+
+    Call it before any password hashing so throttled requests stay cheap.
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+
+    backend = get_rate_limit_backend()
+    window = settings.AUTH_RATE_LIMIT_WINDOW
+
+    for key_type, value, limit in (
+        ("ip", client_ip(request), settings.AUTH_RATE_LIMIT_PER_IP),
+        ("email", email.lower(), settings.AUTH_RATE_LIMIT_PER_EMAIL),
+    ):
+        retry_after = await backend.hit(f"{route}:{key_type}:{value}", limit, window)
+
+        if retry_after > 0:
+            RATE_LIMIT_HITS.labels(route, key_type).inc()
+
+            raise HTTPException(
+                status_code=http_status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="TOO_MANY_REQUESTS",
+                headers={"Retry-After": str(max(math.ceil(retry_after), 1))},
+            )
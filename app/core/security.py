@@ -1,15 +1,23 @@
 import contextlib
+import logging
 from datetime import UTC, datetime, timedelta
 from typing import Annotated, Any, Literal, TypedDict, cast
 
-import bcrypt
 import jwt
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
-from ..models.user import User
+from ..exceptions import WorkerPoolSaturatedError
 from ..repositories.user import UserRepository
+from ..schemas.user import UserPrincipal
+from .cache import TTLCache
 from .config import settings
+from .database import async_session
+from .metrics import PASSWORD_HASH_DURATION
+from .passwords import check_password, hash_password
+from .workers import BoundedWorkerPool
+
+logger = logging.getLogger(__name__)
 
 ALGORITHM = "HS256"
 DEFAULT_TOKEN_EXPIRATION = {
@@ -19,6 +27,12 @@ DEFAULT_TOKEN_EXPIRATION = {
 
 bearer_auth_scheme = HTTPBearer()
 
+password_worker_pool = BoundedWorkerPool(
+    name="password-hash",
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
+
 
 class JwtPayload(TypedDict):
     exp: float
@@ -26,6 +40,14 @@ class JwtPayload(TypedDict):
     type: Literal["access", "refresh"]
 
 
+# Keyed by the full token: a cached signature alone would vouch for any payload
+token_cache: TTLCache[str, JwtPayload] = TTLCache(
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    ttl=0,
+    name="token",
+)
+
+
 def create_access_token(
     subject: str | Any,
     expires_delta: timedelta | None = None,
@@ -39,7 +61,12 @@ def create_access_token(
     return encoded_jwt
 
 
-def verify_token(token: str):
+def verify_token(token: str) -> JwtPayload | None:
+    payload = token_cache.get(token)
+
+    if payload is not None:
+        return payload
+
     with contextlib.suppress(jwt.PyJWTError):
         payload = cast(
             JwtPayload,
@@ -50,74 +77,108 @@ def verify_token(token: str):
             ),
         )
 
-        print(payload)  # noqa: T201
+        remaining = payload["exp"] - datetime.now(UTC).timestamp()
 
-        if payload["exp"] > datetime.now(UTC).timestamp():
+        if remaining > 0:
+            # Cached until the token itself expires
+            token_cache.set(token, payload, ttl=remaining)
             return payload
 
     return None
 
 
 def get_password_hash(password: str) -> str:
-    return bcrypt.hashpw(
-        password.encode("utf-8"),
-        bcrypt.gensalt(),
-    ).decode("utf-8")
+    with PASSWORD_HASH_DURATION.labels("hash").time():
+        return hash_password(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(
-        plain_password.encode("utf-8"),
-        hashed_password.encode("utf-8"),
+    with PASSWORD_HASH_DURATION.labels("verify").time():
+        return check_password(plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_worker_pool.run(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_worker_pool.run(
+        verify_password, plain_password, hashed_password
     )
 
 
-def current_user(
-    token: Annotated[HTTPAuthorizationCredentials, Depends(bearer_auth_scheme)],
-    user_repository: UserRepository = Depends(),
-) -> User | None:
-    payload = verify_token(token.credentials)
+async def upgrade_password_hash(
+    user_id: str, password: str, hashed_password: str
+) -> None:
+    """Background task after a login whose hash predates the current policy"""
+    try:
+        new_hashed_password = await get_password_hash_async(password)
+    except WorkerPoolSaturatedError:
+        # Not worth queueing behind interactive logins; the next login retries
+        logger.info("Skipped password rehash for %s: worker pool busy", user_id)
+        return
 
-    if payload:
-        user = user_repository.get(payload["sub"])
+    async with async_session() as session:
+        user_repository = UserRepository(session, replica_session=None)
 
-        if user:
-            return user
+        if await user_repository.replace_password_hash(
+            user_id, hashed_password, new_hashed_password
+        ):
+            await user_repository.commit()
 
-    raise HTTPException(status_code=401, detail="INVALID_AUTHENTICATION_CREDENTIALS")
 
+def _invalid_credentials() -> HTTPException:
+    return HTTPException(status_code=401, detail="INVALID_AUTHENTICATION_CREDENTIALS")
 
-def current_verified_user(
+
+async def resolve_principal(
+    request: Request,
     token: Annotated[HTTPAuthorizationCredentials, Depends(bearer_auth_scheme)],
     user_repository: UserRepository = Depends(),
-) -> User | None:
-    payload = verify_token(token.credentials)
+) -> UserPrincipal:
+    """Decode the bearer token and load its user once per request.
 
-    if payload:
-        user = user_repository.get(payload["sub"])
+    The result is kept on ``request.state.principal`` for anything outside
+    dependency injection that needs the caller.
+    """
+    principal: UserPrincipal | None = getattr(request.state, "principal", None)
 
-        if user and user.verified:
-            return user
+    if principal is None:
+        payload = verify_token(token.credentials)
 
-    raise HTTPException(status_code=401, detail="INVALID_AUTHENTICATION_CREDENTIALS")
+        if payload:
+            principal = await user_repository.get_principal(payload["sub"])
 
+        if principal is None:
+            raise _invalid_credentials()
 
-def admin_user(
-    token: Annotated[HTTPAuthorizationCredentials, Depends(bearer_auth_scheme)],
-    user_repository: UserRepository = Depends(),
-) -> User | None:
-    payload = verify_token(token.credentials)
+        request.state.principal = principal
+
+    return principal
+
+
+PrincipalDep = Annotated[UserPrincipal, Depends(resolve_principal)]
+
+
+async def current_user(principal: PrincipalDep) -> UserPrincipal:
+    return principal
+
+
+async def current_verified_user(principal: PrincipalDep) -> UserPrincipal:
+    if principal.verified:
+        return principal
+
+    raise _invalid_credentials()
 
-    if payload:
-        user = user_repository.get(payload["sub"])
 
-        if user and user.is_admin:
-            return user
+async def admin_user(principal: PrincipalDep) -> UserPrincipal:
+    if principal.is_admin:
+        return principal
 
-    raise HTTPException(status_code=401, detail="INVALID_AUTHENTICATION_CREDENTIALS")
+    raise _invalid_credentials()
 
 
 # Dependency annotations
-UserDep = Annotated[User, Depends(current_user)]
-VerifiedUserDep = Annotated[User, Depends(current_verified_user)]
-AdminUserDep = Annotated[User, Depends(admin_user)]
+UserDep = Annotated[UserPrincipal, Depends(current_user)]
+VerifiedUserDep = Annotated[UserPrincipal, Depends(current_verified_user)]
+AdminUserDep = Annotated[UserPrincipal, Depends(admin_user)]
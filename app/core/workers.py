@@ -0,0 +1,128 @@
+import asyncio
+import statistics
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from ..exceptions import WorkerPoolSaturatedError
+from .metrics import WORKER_POOL_QUEUE_DEPTH, WORKER_POOL_REJECTED
+
+T = TypeVar("T")
+
+
+class BoundedWorkerPool:
+    """Thread pool with a bounded backlog for CPU-heavy calls that release the GIL.
+
+    Calls beyond ``max_workers + max_queue_size`` are rejected instead of
+    piling up behind the event loop.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        max_queue_size: int,
+        latency_window: int = 1024,
+    ) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix=self.name,
+            )
+
+        return self._executor
+
+    def _call(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            self._running += 1
+
+        self._record_queue_depth()
+
+        started_at = time.perf_counter()
+
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started_at
+
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._latencies.append(elapsed)
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue_size:
+                self._rejected += 1
+                WORKER_POOL_REJECTED.labels(self.name).inc()
+                raise WorkerPoolSaturatedError(self.name)
+
+            self._pending += 1
+
+        self._record_queue_depth()
+
+        try:
+            future = self._get_executor().submit(self._call, fn, *args)
+        except BaseException:
+            self._release()
+            raise
+
+        # Released when the call finishes, not when the awaiting task does:
+        # a cancelled request leaves its bcrypt call running in the executor
+        future.add_done_callback(self._release)
+
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _: object = None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+        self._record_queue_depth()
+
+    @property
+    def queue_depth(self) -> int:
+        return max(self._pending - self._running, 0)
+
+    def _record_queue_depth(self) -> None:
+        WORKER_POOL_QUEUE_DEPTH.labels(self.name).set(self.queue_depth)
+
+    def stats(self) -> dict[str, float | int]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats: dict[str, float | int] = {
+                "workers": self.max_workers,
+                "in_flight": self._running,
+                "queue_depth": max(self._pending - self._running, 0),
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+        if latencies:
+            stats["latency_p50_seconds"] = statistics.median(latencies)
+            stats["latency_p95_seconds"] = latencies[
+                min(len(latencies) - 1, int(len(latencies) * 0.95))
+            ]
+            stats["latency_max_seconds"] = latencies[-1]
+
+        return stats
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,6 @@
+class WorkerPoolSaturatedError(Exception):
+    """Raised when a bounded worker pool has no free slot for new work"""
+
+    def __init__(self, pool_name: str) -> None:
+        super().__init__(f"Worker pool '{pool_name}' is saturated")
+        self.pool_name = pool_name
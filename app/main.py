@@ -1,24 +1,87 @@
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+
 import sentry_sdk
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi import status as http_status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
+from .core.compression import CompressionMiddleware
 from .core.config import settings
+from .core.database import dispose_async_engine
+from .core.metrics import MetricsMiddleware, mark_dead_processes, mark_process_dead
+from .core.responses import FastJSONResponse
+from .exceptions import WorkerPoolSaturatedError
 
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "development":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None]:  # noqa: ARG001
+    if settings.METRICS_ENABLED:
+        # Pool and queue gauges of replaced workers would otherwise keep
+        # adding up in the multiprocess "livesum" aggregation
+        mark_dead_processes()
+
+    yield
+
+    from .core.security import password_worker_pool
+
+    password_worker_pool.shutdown()
+    await dispose_async_engine()
+
+    if settings.METRICS_ENABLED:
+        mark_process_dead()
+
+
 def include_routers(app: FastAPI):
     from .routers.auth import router as auth_router
+    from .routers.health import router as health_router
     from .routers.users import router as users_router
 
     app.include_router(auth_router, prefix="/auth")
     app.include_router(users_router, prefix="/users")
+    app.include_router(health_router)
+
+    if settings.METRICS_ENABLED:
+        from .routers.metrics import router as metrics_router
+
+        app.include_router(metrics_router)
+
+
+def include_exception_handlers(app: FastAPI) -> None:
+    @app.exception_handler(WorkerPoolSaturatedError)
+    async def worker_pool_saturated_handler(
+        request: Request,  # noqa: ARG001
+        exc: WorkerPoolSaturatedError,  # noqa: ARG001
+    ) -> JSONResponse:
+        return JSONResponse(
+            status_code=http_status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "SERVER_BUSY"},
+            headers={"Retry-After": "1"},
+        )
+
+    @app.exception_handler(PoolTimeoutError)
+    async def database_pool_timeout_handler(
+        request: Request,  # noqa: ARG001
+        exc: PoolTimeoutError,  # noqa: ARG001
+    ) -> JSONResponse:
+        # No connection freed up within DB_POOL_TIMEOUT; shed load instead of hanging
+        return JSONResponse(
+            status_code=http_status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "DATABASE_BUSY"},
+            headers={"Retry-After": "1"},
+        )
 
 
 def create_app():
     app = FastAPI(
         title="Coffee Shop API",
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,
         description="""
         ## Coffee Shop User Management API
 
@@ -90,6 +153,20 @@ def create_app():
             allow_headers=["*"],
         )
 
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+            gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+            brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+            zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+        )
+
+    # Added last so it is outermost and its timings include compression
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+
+    include_exception_handlers(app)
     include_routers(app)
 
     return app
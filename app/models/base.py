@@ -7,6 +7,9 @@ from ulid import ULID
 
 class Base(DeclarativeBase):
     __abstract__ = True
+    # Read server-generated values (updated_at) back through RETURNING on
+    # UPDATE too, so they never need a lazy load after a flush
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[str] = mapped_column(
         types.String(26),
@@ -22,5 +25,7 @@ class Base(DeclarativeBase):
     updated_at: Mapped[datetime] = mapped_column(
         types.DateTime(timezone=True),
         server_default=func.now(),
-        server_onupdate=func.now(),
+        # Set by every ORM flush and update() statement; Postgres itself has
+        # no ON UPDATE for columns
+        onupdate=func.now(),
     )
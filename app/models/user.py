@@ -1,4 +1,4 @@
-from sqlalchemy import String
+from sqlalchemy import Index, String, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from ..utils import generate_verification_key
@@ -38,3 +38,38 @@ class User(Base):
         String(255),
         nullable=False,
     )
+
+
+# Case-insensitive email lookups and uniqueness
+Index("ix_users_email_lower", func.lower(User.email), unique=True)
+
+# Expired unverified accounts are found by a range scan over this partial index
+Index(
+    "ix_users_unverified_created_at",
+    User.created_at,
+    postgresql_where=text("verified = false"),
+)
+
+# Admin user list filters (GET /users/users)
+Index("ix_users_created_at", User.created_at)
+
+# Admins are few; a partial index keeps is_admin=true listings index-driven
+Index("ix_users_admin_id", User.id, postgresql_where=text("is_admin"))
+
+
+def _lower_trigram_index(column: str) -> Index:
+    # Serves case-insensitive prefix (and substring) LIKE patterns, also when
+    # the pattern is a bind parameter of a generic plan
+    name = f"lower_{column}"
+
+    return Index(
+        f"ix_users_{name}_trgm",
+        func.lower(User.__table__.c[column]).label(name),
+        postgresql_using="gin",
+        postgresql_ops={name: "gin_trgm_ops"},
+    )
+
+
+_lower_trigram_index("email")
+_lower_trigram_index("first_name")
+_lower_trigram_index("last_name")
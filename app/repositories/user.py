@@ -1,52 +1,441 @@
 import datetime
+from collections.abc import AsyncIterator, Collection, Sequence
 from datetime import UTC
+from typing import Any, cast
 
-from ..core.database import session
+from sqlalchemy import (
+    ColumnElement,
+    CursorResult,
+    Executable,
+    Result,
+    Row,
+    Select,
+    delete,
+    exists,
+    func,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..core.database import (
+    AsyncSessionDep,
+    ReplicaSessionDep,
+    get_async_session_factory,
+    get_replica_set,
+    session,
+)
 from ..models.user import User
+from ..schemas.user import UserListQuery, UserPrincipal
 
+# Columns rendered by UserResponse; list endpoints read plain rows, not entities
+USER_RESPONSE_COLUMNS = (
+    User.id,
+    User.email,
+    User.first_name,
+    User.last_name,
+    User.verified,
+)
 
-class UserRepository:
-    def get(self, pk: str):
-        with session() as _session:
-            return _session.query(User).filter(User.id == pk).one_or_none()
+principal_cache: TTLCache[str, UserPrincipal] = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL,
+    name="principal",
+)
 
-    def get_by_email(self, email: str):
-        with session() as _session:
-            return _session.query(User).filter(User.email == email).one_or_none()
+# Users written recently by this process; their reads skip the replicas.
+# Other workers do not see these entries, which is why principals (auth and
+# /me) are always read from the primary rather than relying on this map
+recent_writes: TTLCache[str, bool] = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.REPLICA_READ_YOUR_WRITES_WINDOW,
+)
 
-    def get_all(self):
-        with session() as _session:
-            return _session.query(User).all()
+# Replica errors that are retried on the primary
+REPLICA_ERRORS = (DBAPIError, OSError, PoolTimeoutError)
 
-    def find_expired_authorizations(self):
-        with session() as _session:
-            expiration_threshold = datetime.datetime.now(UTC) - datetime.timedelta(
-                days=2
+
+def _prefix_pattern(prefix: str) -> str:
+    # One bind parameter (not `:p || '%'`) so trigram indexes serve generic plans
+    escaped = (
+        prefix.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    )
+
+    return escaped + "%"
+
+
+def _list_query(
+    columns: Sequence[Any],
+    filters: UserListQuery | None,
+    after: str | None,
+) -> Select[Any]:
+    """``columns`` of the users matching ``filters``, keyset-ordered by the sort"""
+    filters = filters or UserListQuery()
+    sort_column = getattr(User, filters.sort_column)
+
+    query = select(*columns).order_by(
+        sort_column.desc() if filters.descending else sort_column
+    )
+
+    if after is not None:
+        query = query.where(
+            sort_column < after if filters.descending else sort_column > after
+        )
+
+    if filters.verified is not None:
+        query = query.where(User.verified == filters.verified)
+
+    if filters.is_admin is not None:
+        query = query.where(User.is_admin == filters.is_admin)
+
+    if filters.created_after is not None:
+        query = query.where(User.created_at >= filters.created_after)
+
+    if filters.created_before is not None:
+        query = query.where(User.created_at < filters.created_before)
+
+    if filters.email_prefix is not None:
+        query = query.where(
+            func.lower(User.email).like(
+                _prefix_pattern(filters.email_prefix), escape="\\"
             )
+        )
+
+    if filters.name_prefix is not None:
+        pattern = _prefix_pattern(filters.name_prefix)
+        query = query.where(
+            or_(
+                func.lower(User.first_name).like(pattern, escape="\\"),
+                func.lower(User.last_name).like(pattern, escape="\\"),
+            )
+        )
+
+    return query
+
+
+class UserRepository:
+    def __init__(
+        self,
+        session: AsyncSessionDep,
+        replica_session: ReplicaSessionDep,
+    ) -> None:
+        self.session = session
+        self.replica_session = replica_session
+        self._written_ids: set[str] = set()
+        self._has_written = False
 
-            return (
-                _session.query(User)
-                .filter(
-                    (User.created_at < expiration_threshold) & (User.verified == False)  # noqa: E712
+    def _read_session(self, *pks: str) -> AsyncSession | None:
+        if (
+            self.replica_session is None
+            or self._has_written
+            or any(recent_writes.get(pk) for pk in pks)
+        ):
+            return None
+
+        return self.replica_session
+
+    async def _execute_read(self, statement: Executable, *pks: str) -> Result[Any]:
+        """Run a read-only statement on a replica, falling back to the primary"""
+        replica_session = self._read_session(*pks)
+
+        if replica_session is not None:
+            try:
+                return await replica_session.execute(statement)
+            except REPLICA_ERRORS:
+                get_replica_set().mark_failed(replica_session.info["replica"])
+                self.replica_session = None
+
+        return await self.session.execute(statement)
+
+    async def get(self, pk: str) -> User | None:
+        """Entity on the primary, safe to modify and store"""
+        return await self.session.get(User, pk)
+
+    async def get_principal(self, pk: str) -> UserPrincipal | None:
+        principal = principal_cache.get(pk)
+
+        if principal is None:
+            # Primary only: the write may have happened on another worker, and
+            # a replica row would be cached for PRINCIPAL_CACHE_TTL
+            user = await self.session.get(User, pk)
+
+            if user is None:
+                return None
+
+            principal = UserPrincipal.model_validate(user)
+            principal_cache.set(pk, principal)
+
+        return principal
+
+    async def get_by_email(self, email: str, primary: bool = False) -> User | None:
+        """``primary`` for lookups that must see a user created moments ago"""
+        statement = select(User).where(func.lower(User.email) == email.lower())
+
+        if primary:
+            result = await self.session.execute(statement)
+        else:
+            result = await self._execute_read(statement)
+
+        return result.scalar_one_or_none()
+
+    async def email_exists(self, email: str) -> bool:
+        return bool(
+            (
+                await self._execute_read(
+                    select(exists().where(func.lower(User.email) == email.lower()))
                 )
-                .all()
+            ).scalar()
+        )
+
+    async def get_many(self, pks: Collection[str]) -> Sequence[Row[Any]]:
+        """Response columns of every existing user in ``pks``, in one query"""
+        return (
+            await self._execute_read(
+                select(*USER_RESPONSE_COLUMNS).where(User.id.in_(pks)), *pks
             )
+        ).all()
 
-    def store(self, user: User) -> User:
-        with session() as _session:
-            _session.add(user)
-            _session.commit()
-            _session.refresh(user)
+    async def get_all(self) -> list[User]:
+        return list((await self._execute_read(select(User))).scalars())
+
+    async def get_page(
+        self,
+        limit: int,
+        after: str | None = None,
+        filters: UserListQuery | None = None,
+    ) -> Sequence[Row[Any]]:
+        """Keyset page of response columns after the sort value ``after``.
+
+        ``updated_at`` is selected too, for the page ETag.
+        """
+        query = _list_query(
+            (*USER_RESPONSE_COLUMNS, User.updated_at), filters, after
+        ).limit(limit)
+
+        return (await self._execute_read(query)).all()
+
+    async def stream_rows(
+        self,
+        batch_size: int,
+        after: str | None = None,
+        filters: UserListQuery | None = None,
+    ) -> AsyncIterator[Sequence[Row[Any]]]:
+        """Yield batches of response columns through a server-side cursor.
+
+        Runs on its own session, on a replica when one is available, because
+        the body is streamed after the request-scoped session is released.
+        """
+        query = _list_query(USER_RESPONSE_COLUMNS, filters, after).execution_options(
+            yield_per=batch_size
+        )
+
+        replica_set = get_replica_set()
+        name = None if self._has_written else replica_set.choose()
 
-            return user
+        if name is not None:
+            sent = False
 
-    def delete(self, user: User) -> None:
+            try:
+                async with replica_set.factories[name]() as _session:
+                    result = await _session.stream(query)
+
+                    async for partition in result.partitions():
+                        sent = True
+                        yield partition
+
+                return
+            except REPLICA_ERRORS:
+                replica_set.mark_failed(name)
+
+                # Restarting on the primary would duplicate rows already sent
+                if sent:
+                    raise
+
+        async with get_async_session_factory()() as _session:
+            result = await _session.stream(query)
+
+            async for partition in result.partitions():
+                yield partition
+
+    def _invalidate(self, pk: str) -> None:
+        principal_cache.invalidate(pk)
+        self._written_ids.add(pk)
+        self._has_written = True
+
+    async def create(self, **values: Any) -> str | None:
+        """Insert a user in one round trip; ``None`` when the email is taken.
+
+        No conflict target: both the email constraint and the lower(email)
+        index count as "already exists".
+        """
+        result = await self.session.execute(
+            insert(User).values(**values).on_conflict_do_nothing().returning(User.id)
+        )
+        pk = result.scalar_one_or_none()
+
+        if pk is not None:
+            self._invalidate(pk)
+
+        return pk
+
+    async def update_one(
+        self,
+        pk: str,
+        values: dict[str, Any],
+        *conditions: ColumnElement[bool],
+    ) -> Row[Any] | None:
+        """One ``UPDATE ... RETURNING`` of the response columns (and updated_at).
+
+        ``None`` when ``pk`` does not exist or ``conditions`` do not hold; the
+        check and the write are a single atomic statement.
+        """
+        result = await self.session.execute(
+            update(User)
+            .where(User.id == pk, *conditions)
+            .values(**values)
+            .returning(*USER_RESPONSE_COLUMNS, User.updated_at)
+        )
+        row = result.one_or_none()
+
+        if row is not None:
+            self._invalidate(pk)
+
+        return row
+
+    async def verify(self, pk: str, key: str) -> Row[Any] | None:
+        return await self.update_one(
+            pk,
+            {"verified": True, "verification_key": None},
+            User.verification_key == key,
+        )
+
+    async def replace_password_hash(self, pk: str, old: str, new: str) -> bool:
+        """Swap ``old`` for ``new`` unless the password changed in between.
+
+        The hash is not part of any representation, so updated_at (and with
+        it every ETag) is left as it was.
+        """
+        result = await self.session.execute(
+            update(User)
+            .where(User.id == pk, User.hashed_password == old)
+            .values(hashed_password=new, updated_at=User.updated_at)
+            .returning(User.id)
+        )
+
+        return result.scalar_one_or_none() is not None
+
+    async def store(self, user: User) -> User:
+        self.session.add(user)
+        await self.session.flush()
+        self._invalidate(user.id)
+
+        return user
+
+    async def delete(self, user: User) -> None:
+        await self.session.delete(user)
+        await self.session.flush()
+        self._invalidate(user.id)
+
+    async def update_many(
+        self, pks: Collection[str], values: dict[str, Any]
+    ) -> Sequence[Row[Any]]:
+        """Apply ``values`` to every user in ``pks`` with one UPDATE"""
+        result = await self.session.execute(
+            update(User)
+            .where(User.id.in_(pks))
+            .values(**values)
+            .returning(*USER_RESPONSE_COLUMNS)
+        )
+        rows = result.all()
+
+        for row in rows:
+            self._invalidate(row.id)
+
+        return rows
+
+    async def get_deletion_candidates(self, pks: Collection[str]) -> Sequence[Row[Any]]:
+        """Id and admin flag of the existing users in ``pks``, read on the primary"""
+        return (
+            await self.session.execute(
+                select(User.id, User.is_admin).where(User.id.in_(pks))
+            )
+        ).all()
+
+    async def delete_many(self, pks: Collection[str]) -> set[str]:
+        """Delete the non-admin users in ``pks`` with one DELETE"""
+        result = await self.session.execute(
+            delete(User)
+            .where(User.id.in_(pks) & (User.is_admin == False))  # noqa: E712
+            .returning(User.id)
+        )
+        deleted = set(result.scalars())
+
+        for pk in deleted:
+            self._invalidate(pk)
+
+        return deleted
+
+    async def commit(self) -> None:
+        await self.session.commit()
+
+        # Drop entries another request may have cached before the commit landed
+        for pk in self._written_ids:
+            principal_cache.invalidate(pk)
+            recent_writes.set(pk, True)
+
+        self._written_ids.clear()
+
+
+class SyncUserRepository:
+    """Blocking repository used outside the event loop (actors, scheduler)"""
+
+    def get_pending_verification(self, pk: str) -> tuple[str, str] | None:
+        """Email and verification key of ``pk`` while it is still unverified"""
         with session() as _session:
-            _session.delete(user)
-            _session.commit()
+            row = _session.execute(
+                select(User.email, User.verification_key).where(
+                    (User.id == pk) & (User.verified == False)  # noqa: E712
+                )
+            ).one_or_none()
+
+        if row is None or row.verification_key is None:
+            return None
+
+        return row.email, row.verification_key
+
+    def delete_expired_authorizations(
+        self,
+        expires_after: datetime.timedelta,
+        batch_size: int,
+    ) -> int:
+        """Delete one batch of unverified users older than ``expires_after``.
+
+        Each call is its own short transaction; ``SKIP LOCKED`` lets
+        concurrent purges work on disjoint rows instead of queueing.
+        """
+        expiration_threshold = datetime.datetime.now(UTC) - expires_after
+
+        expired_ids = (
+            select(User.id)
+            .where(
+                (User.created_at < expiration_threshold) & (User.verified == False)  # noqa: E712
+            )
+            .order_by(User.created_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
 
-    def delete_many(self, users: list[User]) -> None:
         with session() as _session:
-            for user in users:
-                _session.delete(user)
+            result = cast(
+                CursorResult[Any],
+                _session.execute(delete(User).where(User.id.in_(expired_ids))),
+            )
             _session.commit()
+
+            return result.rowcount
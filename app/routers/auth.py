@@ -1,14 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+import logging
+from typing import Any
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
 from fastapi import status as http_status
+from fastapi.concurrency import run_in_threadpool
 
+from ..actors import send_verification_key
+from ..core.broker import BROKER_ERRORS
+from ..core.config import settings
+from ..core.passwords import needs_rehash
+from ..core.rate_limit import enforce_auth_rate_limit
 from ..core.security import (
     UserDep,
     create_access_token,
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    upgrade_password_hash,
+    verify_password_async,
     verify_token,
 )
-from ..models.user import User
 from ..repositories.user import UserRepository
 from ..schemas.auth import (
     LoginRequest,
@@ -21,6 +30,14 @@ from ..schemas.auth import (
 
 router = APIRouter(tags=["login"])
 
+logger = logging.getLogger(__name__)
+
+TOO_MANY_REQUESTS_RESPONSE: dict[int | str, dict[str, Any]] = {
+    http_status.HTTP_429_TOO_MANY_REQUESTS: {
+        "content": {"application/json": {"example": {"detail": "TOO_MANY_REQUESTS"}}}
+    },
+}
+
 
 @router.post(
     "/signup",
@@ -30,32 +47,48 @@ router = APIRouter(tags=["login"])
                 "application/json": {"example": {"detail": "USER_ALREADY_EXISTS"}}
             }
         },
+        **TOO_MANY_REQUESTS_RESPONSE,
     },
 )
 async def signup(
+    request: Request,
     data: SignUpRequest,
     user_repository: UserRepository = Depends(),
 ) -> None:
-    user = user_repository.get_by_email(data.email)
+    await enforce_auth_rate_limit(request, "signup", data.email)
 
-    if user:
+    # Optional: an obvious duplicate should not cost a bcrypt round
+    if settings.SIGNUP_EMAIL_PRECHECK and await user_repository.email_exists(
+        data.email
+    ):
         raise HTTPException(
             status_code=http_status.HTTP_400_BAD_REQUEST,
             detail="USER_ALREADY_EXISTS",
         )
 
-    new_user = User(
+    # The INSERT itself decides races between concurrent signups
+    user_id = await user_repository.create(
         email=data.email,
         first_name=data.first_name,
         last_name=data.last_name,
-        hashed_password=get_password_hash(data.password),
+        hashed_password=await get_password_hash_async(data.password),
     )
 
-    user_repository.store(new_user)
+    if user_id is None:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="USER_ALREADY_EXISTS",
+        )
 
-    print(  # noqa: T201
-        f"New user signed up: {new_user.email}, verification key: {new_user.verification_key}"
-    )
+    await user_repository.commit()
+
+    # Delivery happens on a worker; enqueueing is a blocking broker call.
+    # The account is committed by now, so a broker outage must not turn the
+    # signup into a 500 that a retry would answer with USER_ALREADY_EXISTS
+    try:
+        await run_in_threadpool(send_verification_key.send, user_id)
+    except BROKER_ERRORS:
+        logger.exception("Could not enqueue the verification key for %s", user_id)
 
 
 @router.post(
@@ -66,16 +99,28 @@ async def signup(
                 "application/json": {"example": {"detail": "INVALID_EMAIL_OR_PASSWORD"}}
             }
         },
+        **TOO_MANY_REQUESTS_RESPONSE,
     },
 )
 async def login(
+    request: Request,
     data: LoginRequest,
+    background_tasks: BackgroundTasks,
     user_repository: UserRepository = Depends(),
 ) -> LoginResponse:
-    user = user_repository.get_by_email(data.email)
+    await enforce_auth_rate_limit(request, "login", data.email)
+
+    # Primary: a replica may not have the row of an account that just signed up
+    user = await user_repository.get_by_email(data.email, primary=True)
 
     if user:
-        if verify_password(data.password, user.hashed_password):
+        if await verify_password_async(data.password, user.hashed_password):
+            # The plain password is only at hand now; upgrade after responding
+            if needs_rehash(user.hashed_password):
+                background_tasks.add_task(
+                    upgrade_password_hash, user.id, data.password, user.hashed_password
+                )
+
             access_token = create_access_token(subject=user.id)
             refresh_token = create_access_token(subject=user.id, type="refresh")
 
@@ -132,14 +177,11 @@ async def verify(
     user: UserDep,
     user_repository: UserRepository = Depends(),
 ) -> None:
-    if user.verification_key == data.key:
-        user.verified = True
-        user.verification_key = None
-        user_repository.store(user)
-
-        return
+    # Key check and write in one statement: a wrong key simply matches no row
+    if await user_repository.verify(user.id, data.key) is None:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="INVALID_VERIFICATION_KEY",
+        )
 
-    raise HTTPException(
-        status_code=http_status.HTTP_400_BAD_REQUEST,
-        detail="INVALID_VERIFICATION_KEY",
-    )
+    await user_repository.commit()
@@ -0,0 +1,25 @@
+from typing import Any
+
+from fastapi import APIRouter
+
+from ..core.database import get_pool_statuses
+from ..core.security import password_worker_pool, token_cache
+from ..repositories.user import principal_cache
+
+router = APIRouter(tags=["health"])
+
+
+@router.get("/health", include_in_schema=False)
+async def health() -> dict[str, Any]:
+    return {
+        "status": "ok",
+        "database_pools": get_pool_statuses(),
+        # Per process, like the pools: the worker that answered
+        "caches": {
+            "principal": principal_cache.stats(),
+            "token": token_cache.stats(),
+        },
+        "worker_pools": {
+            password_worker_pool.name: password_worker_pool.stats(),
+        },
+    }
@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Response
+
+from ..core.metrics import render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    content, media_type = render_metrics()
+
+    return Response(content=content, media_type=media_type)
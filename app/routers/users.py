@@ -1,51 +1,233 @@
-from typing import Annotated
+from collections.abc import AsyncIterator, Sequence
+from typing import Annotated, Any, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
 from fastapi import status as http_status
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import Row
 
+from ..core.responses import (
+    conditional_response,
+    make_etag,
+)
 from ..core.security import AdminUserDep, UserDep
 from ..repositories.user import UserRepository
-from ..schemas.user import UserListResponse, UserResponse, UserUpdateRequest
+from ..schemas.user import (
+    MAX_BATCH_SIZE,
+    UserBatchResponse,
+    UserBatchResult,
+    UserBatchUpdateRequest,
+    UserListQuery,
+    UserPageResponse,
+    UserResponse,
+    UserUpdateRequest,
+    user_list_adapter,
+)
 
 router = APIRouter(tags=["users"])
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 1000
+
+BatchIdsQuery = Annotated[
+    list[str], Query(alias="id", min_length=1, max_length=MAX_BATCH_SIZE)
+]
+
+
+NOT_MODIFIED_RESPONSE: dict[int | str, dict[str, Any]] = {
+    http_status.HTTP_304_NOT_MODIFIED: {
+        "description": "The representation named in If-None-Match is current",
+    },
+}
 
-@router.get("/me")
-async def me(user: UserDep) -> UserResponse:
-    return UserResponse.model_validate(user)
 
+@router.get("/me", response_model=UserResponse, responses=NOT_MODIFIED_RESPONSE)
+async def me(request: Request, user: UserDep) -> Response:
+    return conditional_response(
+        request,
+        make_etag(user.id, user.updated_at),
+        UserResponse.model_validate(user),
+    )
 
-@router.get("/users")
+
+@router.get(
+    "/users",
+    response_model=UserPageResponse,
+    responses={
+        http_status.HTTP_200_OK: {
+            "content": {"application/x-ndjson": {}},
+            "description": "A page of users, or every user as NDJSON when format=ndjson",
+        },
+        **NOT_MODIFIED_RESPONSE,
+    },
+)
 async def users(
+    request: Request,
+    user: AdminUserDep,  # noqa: ARG001
+    filters: Annotated[UserListQuery, Depends()],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    # The id, or the email when sorting by email, of the last user seen
+    cursor: Annotated[str | None, Query(max_length=100)] = None,
+    format: Literal["json", "ndjson"] = "json",
+    user_repository: UserRepository = Depends(),
+) -> Response:
+    if format == "ndjson":
+        return StreamingResponse(
+            _stream_users(user_repository, after=cursor, filters=filters),
+            media_type="application/x-ndjson",
+        )
+
+    # Fetch one extra row to know whether another page exists
+    rows = await user_repository.get_page(limit + 1, after=cursor, filters=filters)
+    page = rows[:limit]
+    next_cursor = getattr(page[-1], filters.sort_column) if len(rows) > limit else None
+
+    # Any insert, update or delete within the page changes its ETag
+    etag = make_etag(next_cursor, *(f"{row.id}@{row.updated_at}" for row in page))
+
+    # Rows are validated exactly once here and written straight to bytes
+    return conditional_response(
+        request,
+        etag,
+        UserPageResponse.model_construct(
+            items=user_list_adapter.validate_python(page, from_attributes=True),
+            next_cursor=next_cursor,
+        ),
+    )
+
+
+async def _stream_users(
+    user_repository: UserRepository,
+    after: str | None,
+    filters: UserListQuery,
+) -> AsyncIterator[bytes]:
+    async for rows in user_repository.stream_rows(
+        STREAM_BATCH_SIZE, after=after, filters=filters
+    ):
+        yield b"".join(
+            user.model_dump_json().encode() + b"\n"
+            for user in user_list_adapter.validate_python(rows, from_attributes=True)
+        )
+
+
+def _batch_results(ids: list[str], rows: Sequence[Row[Any]]) -> UserBatchResponse:
+    found = dict(
+        zip(
+            (row.id for row in rows),
+            user_list_adapter.validate_python(rows, from_attributes=True),
+            strict=True,
+        )
+    )
+
+    return UserBatchResponse(
+        results=[
+            UserBatchResult(id=pk, status=200, user=found[pk])
+            if pk in found
+            else UserBatchResult(id=pk, status=404, detail="USER_NOT_FOUND")
+            for pk in ids
+        ]
+    )
+
+
+# Batch routes are declared before /users/{id} so "batch" is not taken for an id
+@router.get("/users/batch")
+async def get_users_batch(
     user: AdminUserDep,  # noqa: ARG001
+    ids: BatchIdsQuery,
+    user_repository: UserRepository = Depends(),
+) -> UserBatchResponse:
+    ids = list(dict.fromkeys(ids))
+
+    return _batch_results(ids, await user_repository.get_many(ids))
+
+
+@router.patch("/users/batch")
+async def update_users_batch(
+    data: UserBatchUpdateRequest,
+    user: AdminUserDep,  # noqa: ARG001
+    user_repository: UserRepository = Depends(),
+) -> UserBatchResponse:
+    ids = list(dict.fromkeys(data.ids))
+    rows = await user_repository.update_many(
+        ids, data.changes.model_dump(exclude_unset=True)
+    )
+    await user_repository.commit()
+
+    return _batch_results(ids, rows)
+
+
+@router.delete("/users/batch")
+async def delete_users_batch(
+    user: AdminUserDep,
+    ids: BatchIdsQuery,
     user_repository: UserRepository = Depends(),
-) -> UserListResponse:
-    users = user_repository.get_all()
+) -> UserBatchResponse:
+    ids = list(dict.fromkeys(ids))
+    candidates = {
+        row.id: row.is_admin
+        for row in await user_repository.get_deletion_candidates(ids)
+    }
+    results: dict[str, UserBatchResult] = {}
+
+    # Same rules, in the same order, as delete_user
+    for pk in ids:
+        if pk not in candidates:
+            results[pk] = UserBatchResult(id=pk, status=404, detail="USER_NOT_FOUND")
+        elif pk == user.id:
+            results[pk] = UserBatchResult(
+                id=pk, status=400, detail="ADMIN_USERS_CANNOT_DELETE_THEMSELVES"
+            )
+        elif candidates[pk]:
+            results[pk] = UserBatchResult(
+                id=pk, status=403, detail="CANNOT_DELETE_ANOTHER_ADMIN_USER"
+            )
+
+    deletable = [pk for pk in ids if pk not in results]
 
-    return [UserResponse.model_validate(u) for u in users]
+    if deletable:
+        deleted = await user_repository.delete_many(deletable)
+        await user_repository.commit()
+
+        for pk in deletable:
+            # Rows gone (or promoted) between the check and the DELETE
+            results[pk] = (
+                UserBatchResult(id=pk, status=200)
+                if pk in deleted
+                else UserBatchResult(id=pk, status=404, detail="USER_NOT_FOUND")
+            )
+
+    return UserBatchResponse(results=[results[pk] for pk in ids])
 
 
 @router.get(
     "/users/{id}",
+    response_model=UserResponse,
     responses={
         http_status.HTTP_404_NOT_FOUND: {
             "content": {"application/json": {"example": {"detail": "USER_NOT_FOUND"}}}
         },
+        **NOT_MODIFIED_RESPONSE,
     },
 )
 async def get_user(
+    request: Request,
     user: AdminUserDep,  # noqa: ARG001
     user_id: Annotated[str, Path(alias="id")],
     user_repository: UserRepository = Depends(),
-) -> UserResponse:
-    target_user = user_repository.get(user_id)
+) -> Response:
+    target_user = await user_repository.get(user_id)
 
     if not target_user:
         raise HTTPException(
             status_code=http_status.HTTP_404_NOT_FOUND, detail="USER_NOT_FOUND"
         )
 
-    return UserResponse.model_validate(target_user)
+    return conditional_response(
+        request,
+        make_etag(target_user.id, target_user.updated_at),
+        UserResponse.model_validate(target_user),
+    )
 
 
 @router.patch(
@@ -75,20 +257,17 @@ async def update_user(
             detail="NOT_AUTHORIZED_TO_UPDATE_THIS_USER",
         )
 
-    target_user = user_repository.get(user_id)
+    row = await user_repository.update_one(user_id, data.model_dump(exclude_unset=True))
 
-    if not target_user:
+    if row is None:
         raise HTTPException(
             status_code=http_status.HTTP_404_NOT_FOUND,
             detail="USER_NOT_FOUND",
         )
 
-    for field, value in data.model_dump(exclude_unset=True).items():
-        setattr(target_user, field, value)
-
-    user_repository.store(target_user)
+    await user_repository.commit()
 
-    return UserResponse.model_validate(target_user)
+    return UserResponse.model_validate(row)
 
 
 @router.delete(
@@ -118,7 +297,7 @@ async def delete_user(
     user_id: Annotated[str, Path(alias="id")],
     user_repository: UserRepository = Depends(),
 ) -> None:
-    target_user = user_repository.get(user_id)
+    target_user = await user_repository.get(user_id)
 
     if not target_user:
         raise HTTPException(
@@ -138,4 +317,5 @@ async def delete_user(
             detail="CANNOT_DELETE_ANOTHER_ADMIN_USER",
         )
 
-    user_repository.delete(target_user)
+    await user_repository.delete(target_user)
+    await user_repository.commit()
@@ -1,9 +1,51 @@
+"""Periodic jobs: ``python app/scheduler.py``.
+
+Any number of replicas may run; only the one holding the scheduler advisory
+lock enqueues a tick's actor, the others record it as skipped. The work
+itself runs on the Dramatiq workers.
+"""
+
 import logging
+from typing import Any
 
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
+from dramatiq import Actor
+from prometheus_client import start_http_server
 
 from app.actors.clear_expired_authorizations import clear_expired_authorizations
+from app.core.broker import BROKER_ERRORS
+from app.core.config import settings
+from app.core.leader import AdvisoryLockLeader
+from app.core.metrics import SCHEDULED_JOB_RUNS, get_registry
+
+logger = logging.getLogger("app.scheduler")
+
+leader = AdvisoryLockLeader("coffee_shop_api.scheduler")
+
+# Job name -> (actor, crontab)
+JOBS: dict[str, tuple[Actor[..., Any], str]] = {
+    "clear_expired_authorizations": (
+        clear_expired_authorizations,
+        settings.PURGE_SCHEDULE,
+    ),
+}
+
+
+def run_job(name: str, actor: Actor[..., Any]) -> None:
+    # The lease only guards the enqueue; a worker picks the message up
+    if not leader.is_leader():
+        SCHEDULED_JOB_RUNS.labels(name, "skipped").inc()
+        return
+
+    try:
+        actor.send()
+    except BROKER_ERRORS:
+        SCHEDULED_JOB_RUNS.labels(name, "failure").inc()
+        logger.exception("Could not enqueue scheduled job %s", name)
+    else:
+        SCHEDULED_JOB_RUNS.labels(name, "enqueued").inc()
+
 
 if __name__ == "__main__":
     logging.basicConfig(
@@ -11,12 +53,21 @@ if __name__ == "__main__":
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     )
 
+    if settings.METRICS_ENABLED:
+        start_http_server(settings.SCHEDULER_METRICS_PORT, registry=get_registry())
+
     scheduler = BlockingScheduler()
-    scheduler.add_job(
-        clear_expired_authorizations,
-        # Every 5 minutes
-        CronTrigger.from_crontab("*/5 * * * *"),
-    )
+
+    for name, (actor, crontab) in JOBS.items():
+        scheduler.add_job(
+            run_job,
+            CronTrigger.from_crontab(crontab),
+            args=[name, actor],
+            id=name,
+            # A late or overlapping tick runs once, not once per missed slot
+            coalesce=True,
+            max_instances=1,
+        )
 
     try:
         logging.info("Starting scheduler...")
@@ -24,3 +75,5 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         logging.info("Shutting down scheduler...")
         scheduler.shutdown()
+    finally:
+        leader.release()
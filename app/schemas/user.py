@@ -1,4 +1,10 @@
-from pydantic import BaseModel, ConfigDict, EmailStr
+from datetime import datetime
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, TypeAdapter
+
+# Upper bound on the ids accepted by the batch endpoints
+MAX_BATCH_SIZE = 100
 
 
 class UserResponse(BaseModel):
@@ -13,7 +19,74 @@ class UserResponse(BaseModel):
 
 UserListResponse = list[UserResponse]
 
+# Built once; validating a whole list through it avoids per-row model_validate calls
+user_list_adapter: TypeAdapter[UserListResponse] = TypeAdapter(UserListResponse)
+
+
+class UserPageResponse(BaseModel):
+    items: UserListResponse
+    next_cursor: str | None
+
+
+# Sort field -> column; ULID ids are creation-ordered, so "created_at" keysets on id
+SORT_COLUMNS = {"created_at": "id", "email": "email"}
+
+UserSort = Literal["created_at", "-created_at", "email", "-email"]
+
+
+class UserListQuery(BaseModel):
+    """Filters and sort order of the admin user list"""
+
+    verified: bool | None = None
+    is_admin: bool | None = None
+    created_after: datetime | None = None
+    created_before: datetime | None = None
+    # Case-insensitive; name_prefix matches first or last name
+    email_prefix: Annotated[str, Field(min_length=1, max_length=100)] | None = None
+    name_prefix: Annotated[str, Field(min_length=1, max_length=50)] | None = None
+    sort: UserSort = "created_at"
+
+    @property
+    def sort_column(self) -> str:
+        return SORT_COLUMNS[self.sort.removeprefix("-")]
+
+    @property
+    def descending(self) -> bool:
+        return self.sort.startswith("-")
+
+
+class UserPrincipal(BaseModel):
+    """Immutable snapshot of the authenticated user, safe to share between requests"""
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: str
+    email: str
+    first_name: str | None
+    last_name: str | None
+    is_admin: bool
+    verified: bool | None
+    updated_at: datetime
+
 
 class UserUpdateRequest(BaseModel):
     first_name: str | None
     last_name: str | None
+
+
+class UserBatchUpdateRequest(BaseModel):
+    ids: Annotated[list[str], Field(min_length=1, max_length=MAX_BATCH_SIZE)]
+    changes: UserUpdateRequest
+
+
+class UserBatchResult(BaseModel):
+    """Outcome for one id; ``status`` and ``detail`` match the single-user endpoint"""
+
+    id: str
+    status: int
+    detail: str | None = None
+    user: UserResponse | None = None
+
+
+class UserBatchResponse(BaseModel):
+    results: list[UserBatchResult]
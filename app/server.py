@@ -0,0 +1,106 @@
+"""Production entry point: ``python -m app.server``.
+
+Runs uvicorn's process supervisor with one worker per available core (or
+``SERVER_WORKERS``), sharing the default password hashing pool between them.
+On SIGTERM workers stop accepting connections and get
+``SERVER_GRACEFUL_SHUTDOWN_TIMEOUT`` seconds to drain in-flight requests.
+"""
+
+import importlib.util
+import logging
+import os
+import shutil
+import tempfile
+
+import uvicorn
+
+from .core.config import settings
+
+logger = logging.getLogger(__name__)
+
+APP = "app.main:app"
+
+
+def worker_count() -> int:
+    if settings.SERVER_WORKERS:
+        return settings.SERVER_WORKERS
+
+    # Respects CPU affinity / cpuset limits of the container
+    return os.process_cpu_count() or 1
+
+
+def split_password_hash_pool(workers: int) -> None:
+    """Share the default hashing threads and queue slots between workers.
+
+    Each worker runs its own pool; unless configured explicitly, the sizes are
+    divided so the whole server keeps the single-process admission limits.
+    """
+    if workers <= 1:
+        return
+
+    defaults = {
+        "PASSWORD_HASH_WORKERS": settings.PASSWORD_HASH_WORKERS // workers,
+        "PASSWORD_HASH_QUEUE_SIZE": settings.PASSWORD_HASH_QUEUE_SIZE // workers,
+    }
+
+    for name, value in defaults.items():
+        if name not in settings.model_fields_set:
+            # Spawned workers read their settings from this environment
+            os.environ[name] = str(max(1, value))
+
+
+def prepare_metrics_dir(workers: int) -> None:
+    """Point every worker at a shared, freshly emptied multiprocess directory"""
+    if workers <= 1 or not settings.METRICS_ENABLED:
+        return
+
+    path = os.environ.setdefault(
+        "PROMETHEUS_MULTIPROC_DIR",
+        os.path.join(tempfile.gettempdir(), "coffee_shop_api_metrics"),
+    )
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def preload() -> None:
+    # Workers are spawned and import the app themselves; importing it here
+    # first makes configuration or import errors fail before any fork
+    importlib.import_module(APP.split(":")[0])
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    workers = worker_count()
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+    split_password_hash_pool(workers)
+    prepare_metrics_dir(workers)
+    preload()
+
+    logger.info("Starting %d workers (loop=%s, http=%s)", workers, loop, http)
+
+    uvicorn.run(
+        APP,
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=workers,
+        loop=loop,
+        http=http,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_TIMEOUT,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_TIMEOUT,
+        limit_concurrency=settings.SERVER_LIMIT_CONCURRENCY,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+        access_log=settings.SERVER_ACCESS_LOG,
+    )
+
+
+if __name__ == "__main__":
+    main()
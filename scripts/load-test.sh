@@ -0,0 +1,10 @@
+#!/usr/bin/env bash
+
+set -e
+set -x
+
+# Signups enqueue a verification message; without a Redis broker running,
+# keep those messages in memory (BROKER=redis to include the broker)
+export BROKER="${BROKER:-stub}"
+
+python -m tests.load.run "$@"
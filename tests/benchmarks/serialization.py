@@ -0,0 +1,125 @@
+"""Compare the user list serialization paths on N rows.
+
+``legacy`` loads ORM entities, builds a ``UserResponse`` per row and lets
+FastAPI re-validate the list against ``response_model`` before encoding it
+with the stdlib JSON encoder. ``fast`` selects the response columns as plain
+rows, validates them once through ``user_list_adapter`` and writes bytes
+with ``ModelJSONResponse``. Both read from the same in-memory SQLite table.
+
+    python -m tests.benchmarks.serialization --rows 10000
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from collections.abc import Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+from ulid import ULID
+
+from app.core.responses import ModelJSONResponse
+from app.models import Base, User
+from app.repositories.user import USER_RESPONSE_COLUMNS
+from app.schemas.user import (
+    UserListResponse,
+    UserPageResponse,
+    UserResponse,
+    user_list_adapter,
+)
+
+
+def seed(session: Session, rows: int) -> None:
+    session.execute(
+        insert(User),
+        [
+            {
+                "id": str(ULID()),
+                "email": f"user{i}@coffeeshop.example.com",
+                "first_name": "Bench",
+                "last_name": f"User{i}",
+                "hashed_password": "x",
+                "verified": i % 2 == 0,
+                "is_admin": False,
+            }
+            for i in range(rows)
+        ],
+    )
+    session.commit()
+
+
+def legacy_path(session: Session) -> Callable[[], bytes]:
+    # What FastAPI does with a response_model: dump the returned models,
+    # validate them again, serialize to Python, encode, then json.dumps
+    response_field: TypeAdapter[UserListResponse] = TypeAdapter(UserListResponse)
+
+    def run() -> bytes:
+        session.expunge_all()
+        users = [UserResponse.model_validate(u) for u in session.scalars(select(User))]
+
+        validated = response_field.validate_python([u.model_dump() for u in users])
+        content = jsonable_encoder(response_field.dump_python(validated, mode="json"))
+
+        return JSONResponse(content).body
+
+    return run
+
+
+def fast_path(session: Session) -> Callable[[], bytes]:
+    def run() -> bytes:
+        rows = session.execute(select(*USER_RESPONSE_COLUMNS)).all()
+        page = UserPageResponse.model_construct(
+            items=user_list_adapter.validate_python(rows, from_attributes=True),
+            next_cursor=None,
+        )
+
+        return ModelJSONResponse(page).body
+
+    return run
+
+
+def measure(run: Callable[[], bytes], repeat: int) -> dict[str, float]:
+    run()  # warm-up
+    timings = []
+
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started_at)
+
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "min_ms": round(min(timings) * 1000, 3),
+    }
+
+
+def main(argv: list[str] | None = None) -> dict[str, object]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        seed(session, args.rows)
+
+        legacy = measure(legacy_path(session), args.repeat)
+        fast = measure(fast_path(session), args.repeat)
+
+    return {
+        "rows": args.rows,
+        "legacy": legacy,
+        "fast": fast,
+        "speedup": round(legacy["median_ms"] / fast["median_ms"], 2),
+    }
+
+
+if __name__ == "__main__":
+    sys.stdout.write(json.dumps(main(), indent=2) + "\n")
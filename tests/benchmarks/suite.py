@@ -0,0 +1,416 @@
+"""Microbenchmarks for the security, schema and repository hot paths.
+
+Each benchmark is timed in rounds of an auto-sized number of calls and
+reported as per-call median/min in microseconds. Results are written as
+JSON and compared against a stored baseline; ``compare`` exits non-zero
+when any benchmark got slower than the threshold allows.
+
+A result file holds ``created_at``, the ``environment`` it was recorded in
+(Python, platform, CPU count, hash policy, seeded rows) and ``results``,
+mapping each benchmark name to ``median_us``, ``min_us``, ``rounds`` and
+``number`` (calls per round). Timings only compare within one environment,
+so baselines are recorded per host under ``tests/benchmarks/baselines/``
+and are not committed.
+
+    python -m tests.benchmarks.suite run --output current.json
+    python -m tests.benchmarks.suite compare tests/benchmarks/baselines/local.json current.json
+    python -m tests.benchmarks.suite run --baseline tests/benchmarks/baselines/local.json
+
+The ``repository`` group seeds users under ``@bench.example.com`` in the
+database configured in ``.env`` (see ``tests/load/run.py``), rolls back every
+write and removes the seeded users afterwards. Skip it with
+``--groups security passwords schemas`` when no database is running.
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import delete, insert
+from ulid import ULID
+
+from app.core.config import settings
+from app.core.database import get_async_session_factory
+from app.core.security import (
+    create_access_token,
+    get_password_hash,
+    token_cache,
+    verify_password,
+    verify_token,
+)
+from app.models.user import User
+from app.repositories.user import UserRepository, principal_cache
+from app.schemas.user import UserResponse, user_list_adapter
+
+GROUPS = ("security", "passwords", "schemas", "repository")
+
+EMAIL_DOMAIN = "bench.example.com"
+VERIFICATION_KEY = "00000"
+
+
+@dataclass
+class Benchmark:
+    name: str
+    run: Callable[[], Any]
+
+
+def security_benchmarks() -> list[Benchmark]:
+    token = create_access_token(subject=str(ULID()))
+
+    def verify_token_uncached() -> None:
+        token_cache.clear()
+        verify_token(token)
+
+    return [
+        Benchmark("security.create_access_token", lambda: create_access_token("id")),
+        Benchmark("security.verify_token", verify_token_uncached),
+        Benchmark("security.verify_token_cached", lambda: verify_token(token)),
+    ]
+
+
+def password_benchmarks() -> list[Benchmark]:
+    hashed_password = get_password_hash("benchmark-password")
+
+    return [
+        Benchmark(
+            "passwords.get_password_hash",
+            lambda: get_password_hash("benchmark-password"),
+        ),
+        Benchmark(
+            "passwords.verify_password",
+            lambda: verify_password("benchmark-password", hashed_password),
+        ),
+    ]
+
+
+def schema_benchmarks(rows: int) -> list[Benchmark]:
+    # Transient ORM instances: attribute access goes through instrumentation
+    # exactly like rows loaded by a session
+    users = [
+        User(
+            id=str(ULID()),
+            email=f"user{i}@{EMAIL_DOMAIN}",
+            first_name="Bench",
+            last_name=f"User{i}",
+            verified=i % 2 == 0,
+        )
+        for i in range(rows)
+    ]
+
+    return [
+        Benchmark(
+            f"schemas.model_validate_x{rows}",
+            lambda: [UserResponse.model_validate(user) for user in users],
+        ),
+        Benchmark(
+            f"schemas.list_adapter_x{rows}",
+            lambda: user_list_adapter.validate_python(users, from_attributes=True),
+        ),
+    ]
+
+
+async def purge_bench_users() -> None:
+    async with get_async_session_factory()() as session:
+        await session.execute(delete(User).where(User.email.like(f"%@{EMAIL_DOMAIN}")))
+        await session.commit()
+
+
+async def seed_users(n: int) -> list[str]:
+    ids = sorted(str(ULID()) for _ in range(n))
+
+    async with get_async_session_factory()() as session:
+        await session.execute(
+            insert(User),
+            [
+                {
+                    "id": pk,
+                    "email": f"seed-{i}@{EMAIL_DOMAIN}",
+                    "first_name": "Bench",
+                    "last_name": "User",
+                    "hashed_password": "x",
+                    "verified": False,
+                    "verification_key": VERIFICATION_KEY,
+                    "is_admin": False,
+                }
+                for i, pk in enumerate(ids)
+            ],
+        )
+        await session.commit()
+
+    return ids
+
+
+@asynccontextmanager
+async def repository() -> AsyncIterator[UserRepository]:
+    # A fresh session per call: a shared identity map would answer get()
+    # without touching the database. Leaving without commit rolls back
+    async with get_async_session_factory()() as session:
+        yield UserRepository(session, replica_session=None)
+
+
+def repository_benchmarks(ids: list[str]) -> list[Benchmark]:
+    pk = ids[len(ids) // 2]
+    email = f"seed-{len(ids) // 2}@{EMAIL_DOMAIN}"
+    batch = ids[:100]
+
+    def read(method: Callable[[UserRepository], Awaitable[Any]]) -> Callable[[], Any]:
+        async def run() -> None:
+            async with repository() as user_repository:
+                await method(user_repository)
+
+        return run
+
+    async def get_principal(user_repository: UserRepository) -> None:
+        principal_cache.clear()
+        await user_repository.get_principal(pk)
+
+    async def stream_rows(user_repository: UserRepository) -> None:
+        async for _ in user_repository.stream_rows(1000):
+            pass
+
+    async def create(user_repository: UserRepository) -> None:
+        await user_repository.create(
+            email=f"{ULID()}@{EMAIL_DOMAIN}".lower(),
+            first_name="Bench",
+            last_name="User",
+            hashed_password="x",
+        )
+
+    async def store(user_repository: UserRepository) -> None:
+        await user_repository.store(
+            User(email=f"{ULID()}@{EMAIL_DOMAIN}".lower(), hashed_password="x")
+        )
+
+    async def delete_one(user_repository: UserRepository) -> None:
+        user = await user_repository.get(pk)
+        assert user is not None
+        await user_repository.delete(user)
+
+    methods: dict[str, Callable[[UserRepository], Awaitable[Any]]] = {
+        "get": lambda r: r.get(pk),
+        "get_principal": get_principal,
+        "get_by_email": lambda r: r.get_by_email(email),
+        "email_exists": lambda r: r.email_exists(email),
+        "get_many_x100": lambda r: r.get_many(batch),
+        "get_all": lambda r: r.get_all(),
+        "get_page_x100": lambda r: r.get_page(100),
+        "stream_rows": stream_rows,
+        "create": create,
+        "store": store,
+        "update_one": lambda r: r.update_one(pk, {"first_name": "Bench"}),
+        "verify": lambda r: r.verify(pk, VERIFICATION_KEY),
+        "update_many_x100": lambda r: r.update_many(batch, {"last_name": "User"}),
+        "get_deletion_candidates_x100": lambda r: r.get_deletion_candidates(batch),
+        "delete": delete_one,
+        "delete_many_x100": lambda r: r.delete_many(batch),
+        "replace_password_hash": lambda r: r.replace_password_hash(pk, "x", "y"),
+    }
+
+    return [
+        Benchmark(f"repository.{name}", read(method))
+        for name, method in methods.items()
+    ]
+
+
+async def time_calls(run: Callable[[], Any], number: int) -> float:
+    if inspect.iscoroutinefunction(run):
+        started_at = time.perf_counter()
+
+        for _ in range(number):
+            await run()
+
+        return time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+
+    for _ in range(number):
+        run()
+
+    return time.perf_counter() - started_at
+
+
+async def measure(
+    benchmark: Benchmark, rounds: int, min_time: float
+) -> dict[str, float | int]:
+    # Like timeit.autorange: grow the calls per round until a round is long
+    # enough for the clock, so fast and slow paths are equally stable
+    number = 1
+
+    while (elapsed := await time_calls(benchmark.run, number)) < min_time:
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    per_call = [await time_calls(benchmark.run, number) / number for _ in range(rounds)]
+
+    return {
+        "median_us": round(statistics.median(per_call) * 1e6, 3),
+        "min_us": round(min(per_call) * 1e6, 3),
+        "rounds": rounds,
+        "number": number,
+    }
+
+
+async def run_suite(args: argparse.Namespace) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    ids: list[str] = []
+
+    try:
+        benchmarks: list[Benchmark] = []
+
+        if "security" in args.groups:
+            benchmarks += security_benchmarks()
+
+        if "passwords" in args.groups:
+            benchmarks += password_benchmarks()
+
+        if "schemas" in args.groups:
+            benchmarks += schema_benchmarks(args.rows)
+
+        if "repository" in args.groups:
+            await purge_bench_users()
+            ids = await seed_users(args.rows)
+            benchmarks += repository_benchmarks(ids)
+
+        for benchmark in benchmarks:
+            if args.filter and args.filter not in benchmark.name:
+                continue
+
+            results[benchmark.name] = await measure(
+                benchmark, args.rounds, args.min_time
+            )
+            sys.stderr.write(
+                f"{benchmark.name:45} {results[benchmark.name]['median_us']:>14.3f} us\n"
+            )
+    finally:
+        if ids:
+            await purge_bench_users()
+
+    return {
+        "created_at": datetime.now(UTC).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "password_hash_algorithm": settings.PASSWORD_HASH_ALGORITHM,
+            "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+            "rows": args.rows,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float
+) -> list[str]:
+    """Print a comparison table and return the names of regressed benchmarks"""
+    regressions = []
+
+    if baseline["environment"] != current["environment"]:
+        sys.stdout.write(
+            "warning: baseline was recorded in a different environment\n"
+            f"  baseline: {baseline['environment']}\n"
+            f"  current:  {current['environment']}\n\n"
+        )
+
+    sys.stdout.write(
+        f"{'benchmark':45} {'baseline':>12} {'current':>12} {'change':>8}\n"
+    )
+
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+
+        if before is None:
+            sys.stdout.write(
+                f"{name:45} {'-':>12} {result['median_us']:>12.3f}      new\n"
+            )
+            continue
+
+        change = result["median_us"] / before["median_us"] - 1
+        regressed = change > threshold
+
+        if regressed:
+            regressions.append(name)
+
+        sys.stdout.write(
+            f"{name:45} {before['median_us']:>12.3f} {result['median_us']:>12.3f}"
+            f" {change:>+8.1%}{'  REGRESSION' if regressed else ''}\n"
+        )
+
+    return regressions
+
+
+def load(path: str) -> dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the benchmarks")
+    run.add_argument("--groups", nargs="+", choices=GROUPS, default=list(GROUPS))
+    run.add_argument("--filter", help="only benchmarks whose name contains this")
+    run.add_argument("--rows", type=int, default=1000, help="rows to validate/seed")
+    run.add_argument("--rounds", type=int, default=5)
+    run.add_argument(
+        "--min-time", type=float, default=0.05, help="minimum seconds per round"
+    )
+    run.add_argument("--output", help="write the JSON results to this file")
+    run.add_argument("--baseline", help="compare against this baseline afterwards")
+    run.add_argument("--threshold", type=float, default=0.10)
+
+    check = commands.add_parser("compare", help="compare two result files")
+    check.add_argument("baseline")
+    check.add_argument("current")
+    check.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="allowed slowdown of the median, as a fraction (0.10 = 10%%)",
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+
+    if args.command == "compare":
+        current = load(args.current)
+    else:
+        current = asyncio.run(run_suite(args))
+
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(json.dumps(current, indent=2) + "\n")
+        elif not args.baseline:
+            sys.stdout.write(json.dumps(current, indent=2) + "\n")
+
+        if not args.baseline:
+            return 0
+
+    regressions = compare(load(args.baseline), current, args.threshold)
+
+    if regressions:
+        sys.stdout.write(
+            f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}\n"
+        )
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
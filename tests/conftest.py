@@ -0,0 +1,7 @@
+import os
+
+# Settings that have no default; unit tests never reach the database or Redis
+os.environ.setdefault("SECRET_KEY", "test-secret-key-that-is-long-enough-for-hs256")
+os.environ.setdefault("POSTGRES_USER", "postgres")
+os.environ.setdefault("POSTGRES_DB", "test")
+os.environ.setdefault("BROKER", "stub")
@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+from app.core.cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_get_returns_value_until_ttl_expires(clock: list[float]) -> None:
+    ttl_cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=5)
+    ttl_cache.set("a", 1)
+
+    clock[0] += 4.9
+    assert ttl_cache.get("a") == 1
+
+    clock[0] += 0.1
+    assert ttl_cache.get("a") is None
+    assert len(ttl_cache) == 0
+
+
+def test_set_ttl_overrides_default(clock: list[float]) -> None:
+    ttl_cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=60)
+    ttl_cache.set("a", 1, ttl=1)
+
+    clock[0] += 1
+    assert ttl_cache.get("a") is None
+
+
+@pytest.mark.usefixtures("clock")
+def test_evicts_least_recently_used() -> None:
+    ttl_cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    ttl_cache.get("a")
+    ttl_cache.set("c", 3)
+
+    assert ttl_cache.get("b") is None
+    assert ttl_cache.get("a") == 1
+    assert ttl_cache.get("c") == 3
+    assert ttl_cache.stats()["evictions"] == 1
+
+
+def test_maxsize_zero_disables_caching() -> None:
+    ttl_cache: TTLCache[str, int] = TTLCache(maxsize=0, ttl=60)
+    ttl_cache.set("a", 1)
+
+    assert ttl_cache.get("a") is None
+
+
+def test_invalidate_and_clear() -> None:
+    ttl_cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+
+    ttl_cache.invalidate("a")
+    assert ttl_cache.get("a") is None
+    assert ttl_cache.get("b") == 2
+
+    ttl_cache.clear()
+    assert len(ttl_cache) == 0
+
+
+def test_stats_count_hits_and_misses() -> None:
+    ttl_cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=60, name="test")
+    ttl_cache.set("a", 1)
+    ttl_cache.get("a")
+    ttl_cache.get("a")
+    ttl_cache.get("b")
+
+    assert ttl_cache.stats() == {
+        "size": 1,
+        "maxsize": 10,
+        "hits": 2,
+        "misses": 1,
+        "evictions": 0,
+    }
@@ -0,0 +1,167 @@
+import gzip
+from collections.abc import AsyncIterator
+
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core import compression
+from app.core.compression import CompressionMiddleware, negotiate_encoding
+
+ENCODINGS = ("zstd", "br", "gzip")
+BODY = b"x" * 2048
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("GZIP", "gzip"),
+        ("gzip, br", "br"),
+        ("gzip, br, zstd", "zstd"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("br;q=0.5, gzip;q=0.5", "br"),
+        ("*", "zstd"),
+        ("*;q=0.5, gzip", "gzip"),
+        ("*, zstd;q=0, br;q=0", "gzip"),
+        ("gzip;q=0", None),
+        ("gzip;q=bogus", None),
+    ],
+)
+def test_negotiate_encoding(accept_encoding: str, expected: str | None) -> None:
+    assert negotiate_encoding(accept_encoding, ENCODINGS) == expected
+
+
+def test_negotiate_encoding_only_offers_supported() -> None:
+    assert negotiate_encoding("zstd, br", ("gzip",)) is None
+
+
+async def large(_: Request) -> Response:
+    return Response(BODY, headers={"ETag": '"abc"'})
+
+
+async def small(_: Request) -> Response:
+    return Response(b"tiny", headers={"ETag": '"abc"'})
+
+
+async def not_modified(_: Request) -> Response:
+    return Response(status_code=304, headers={"ETag": '"abc"'})
+
+
+async def no_content(_: Request) -> Response:
+    return Response(status_code=204)
+
+
+async def encoded(_: Request) -> Response:
+    return Response(gzip.compress(BODY), headers={"Content-Encoding": "gzip"})
+
+
+async def stream(_: Request) -> StreamingResponse:
+    async def chunks() -> AsyncIterator[bytes]:
+        for _ in range(4):
+            yield BODY
+
+    return StreamingResponse(chunks())
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = Starlette(
+        routes=[
+            Route("/large", large, methods=["GET", "HEAD"]),
+            Route("/small", small),
+            Route("/not-modified", not_modified),
+            Route("/no-content", no_content),
+            Route("/encoded", encoded),
+            Route("/stream", stream),
+        ]
+    )
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("encoding", compression.available_encodings())
+def test_large_body_is_compressed(client: TestClient, encoding: str) -> None:
+    response = client.get("/large", headers={"Accept-Encoding": encoding})
+
+    assert response.headers["content-encoding"] == encoding
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == 'W/"abc"'
+    assert response.content == BODY
+
+
+def test_unacceptable_encoding_passes_through(client: TestClient) -> None:
+    response = client.get("/large", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
+    assert response.headers["etag"] == '"abc"'
+
+
+def test_small_body_is_not_compressed(client: TestClient) -> None:
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.content == b"tiny"
+    assert response.headers["vary"] == "Accept-Encoding"
+    # The identity representation keeps its strong validator
+    assert response.headers["etag"] == '"abc"'
+
+
+def test_not_modified_keeps_strong_etag(client: TestClient) -> None:
+    response = client.get(
+        "/not-modified", headers={"Accept-Encoding": "gzip", "If-None-Match": '"abc"'}
+    )
+
+    assert response.status_code == 304
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == '"abc"'
+
+
+def test_not_modified_matches_compressed_headers(client: TestClient) -> None:
+    response = client.get(
+        "/not-modified",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": 'W/"abc"'},
+    )
+
+    assert response.status_code == 304
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == 'W/"abc"'
+
+
+def test_no_content_is_not_encoded(client: TestClient) -> None:
+    response = client.get("/no-content", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 204
+    assert "content-encoding" not in response.headers
+
+
+def test_head_is_not_encoded(client: TestClient) -> None:
+    response = client.head("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+
+
+def test_encoded_response_passes_through(client: TestClient) -> None:
+    response = client.get("/encoded", headers={"Accept-Encoding": "br, gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == BODY
+
+
+@pytest.mark.parametrize("encoding", compression.available_encodings())
+def test_stream_is_compressed(client: TestClient, encoding: str) -> None:
+    response = client.get("/stream", headers={"Accept-Encoding": encoding})
+
+    assert response.headers["content-encoding"] == encoding
+    assert "content-length" not in response.headers
+    assert response.content == BODY * 4
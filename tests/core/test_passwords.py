@@ -0,0 +1,71 @@
+from importlib.util import find_spec
+
+import bcrypt
+import pytest
+
+from app.core import passwords
+from app.core.config import settings
+from app.core.passwords import needs_rehash
+
+
+def bcrypt_hash(rounds: int) -> str:
+    return bcrypt.hashpw(b"password", bcrypt.gensalt(rounds=rounds)).decode()
+
+
+def test_bcrypt_hash_at_policy_cost_is_kept(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ALGORITHM", "bcrypt")
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+
+    assert not needs_rehash(bcrypt_hash(4))
+
+
+def test_bcrypt_hash_at_other_cost_is_rehashed(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ALGORITHM", "bcrypt")
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+
+    assert needs_rehash(bcrypt_hash(4))
+
+
+argon2 = pytest.mark.skipif(
+    find_spec("argon2") is None, reason="argon2-cffi is not installed"
+)
+
+
+@pytest.fixture
+def argon2_policy(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ALGORITHM", "argon2")
+    monkeypatch.setattr(settings, "ARGON2_TIME_COST", 1)
+    monkeypatch.setattr(settings, "ARGON2_MEMORY_COST", 1024)
+    monkeypatch.setattr(settings, "ARGON2_PARALLELISM", 1)
+
+
+@argon2
+@pytest.mark.usefixtures("argon2_policy")
+def test_bcrypt_hash_is_rehashed_under_argon2_policy() -> None:
+    assert needs_rehash(bcrypt_hash(4))
+
+
+@argon2
+@pytest.mark.usefixtures("argon2_policy")
+def test_argon2_hash_at_policy_cost_is_kept() -> None:
+    assert not needs_rehash(passwords.argon2_hasher().hash("password"))
+
+
+@argon2
+@pytest.mark.usefixtures("argon2_policy")
+def test_argon2_hash_at_other_cost_is_rehashed(monkeypatch: pytest.MonkeyPatch) -> None:
+    hashed = passwords.argon2_hasher().hash("password")
+    monkeypatch.setattr(settings, "ARGON2_TIME_COST", 2)
+
+    assert needs_rehash(hashed)
+
+
+@argon2
+@pytest.mark.usefixtures("argon2_policy")
+def test_argon2_hash_is_rehashed_under_bcrypt_policy(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    hashed = passwords.argon2_hasher().hash("password")
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ALGORITHM", "bcrypt")
+
+    assert needs_rehash(hashed)
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.rate_limit import MemoryRateLimitBackend, enforce_auth_rate_limit
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+def hit(backend: MemoryRateLimitBackend, key: str, limit: int, window: float) -> float:
+    return asyncio.run(backend.hit(key, limit, window))
+
+
+@pytest.mark.usefixtures("clock")
+def test_bucket_allows_limit_then_asks_to_retry() -> None:
+    backend = MemoryRateLimitBackend(max_keys=100)
+
+    assert [hit(backend, "k", 3, 60) for _ in range(3)] == [0, 0, 0]
+    # 3 tokens per 60s: the next one is 20s away
+    assert hit(backend, "k", 3, 60) == pytest.approx(20)
+
+
+def test_bucket_refills_at_limit_per_window(clock: list[float]) -> None:
+    backend = MemoryRateLimitBackend(max_keys=100)
+
+    for _ in range(3):
+        hit(backend, "k", 3, 60)
+
+    clock[0] += 19
+    assert hit(backend, "k", 3, 60) == pytest.approx(1)
+
+    clock[0] += 1
+    assert hit(backend, "k", 3, 60) == 0
+    assert hit(backend, "k", 3, 60) > 0
+
+
+def test_bucket_refill_is_capped_at_limit(clock: list[float]) -> None:
+    backend = MemoryRateLimitBackend(max_keys=100)
+    hit(backend, "k", 2, 10)
+
+    clock[0] += 3600
+    assert [hit(backend, "k", 2, 10) for _ in range(3)][-1] > 0
+
+
+@pytest.mark.usefixtures("clock")
+def test_keys_have_separate_buckets() -> None:
+    backend = MemoryRateLimitBackend(max_keys=100)
+    hit(backend, "a", 1, 60)
+
+    assert hit(backend, "a", 1, 60) > 0
+    assert hit(backend, "b", 1, 60) == 0
+
+
+@pytest.mark.usefixtures("clock")
+def test_least_recently_used_keys_are_dropped() -> None:
+    backend = MemoryRateLimitBackend(max_keys=1)
+    hit(backend, "a", 1, 60)
+    hit(backend, "b", 1, 60)
+
+    # "a" was forgotten and starts with a full bucket again
+    assert hit(backend, "a", 1, 60) == 0
+
+
+def make_request(ip: str) -> Request:
+    return Request({"type": "http", "headers": [], "client": (ip, 1234)})
+
+
+@pytest.mark.usefixtures("clock")
+def test_enforce_raises_429_with_retry_after(monkeypatch: pytest.MonkeyPatch) -> None:
+    backend = MemoryRateLimitBackend(max_keys=100)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_PER_IP", 100)
+    monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_PER_EMAIL", 2)
+    monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_WINDOW", 60.0)
+    monkeypatch.setattr(rate_limit, "get_rate_limit_backend", lambda: backend)
+
+    for _ in range(2):
+        asyncio.run(
+            enforce_auth_rate_limit(make_request("10.0.0.1"), "login", "A@x.com")
+        )
+
+    with pytest.raises(HTTPException) as exc_info:
+        # Emails are compared case-insensitively, from any IP
+        asyncio.run(
+            enforce_auth_rate_limit(make_request("10.0.0.2"), "login", "a@x.com")
+        )
+
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.detail == "TOO_MANY_REQUESTS"
+    assert exc_info.value.headers == {"Retry-After": "30"}
+
+
+def test_enforce_is_a_no_op_when_disabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_PER_EMAIL", 0)
+
+    asyncio.run(enforce_auth_rate_limit(make_request("10.0.0.1"), "login", "a@x.com"))
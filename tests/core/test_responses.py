@@ -0,0 +1,39 @@
+import pytest
+from starlette.requests import Request
+
+from app.core.responses import etag_matches, make_etag
+
+ETAG = make_etag(1, "2024-01-01T00:00:00")
+
+
+def make_request(if_none_match: str | None) -> Request:
+    headers = (
+        [] if if_none_match is None else [(b"if-none-match", if_none_match.encode())]
+    )
+    return Request({"type": "http", "headers": headers})
+
+
+def test_make_etag_is_stable_and_quoted() -> None:
+    assert make_etag(1, "a") == make_etag(1, "a")
+    assert make_etag(1, "a") != make_etag(1, "b")
+    assert ETAG.startswith('"') and ETAG.endswith('"')
+
+
+@pytest.mark.parametrize(
+    "if_none_match",
+    [
+        ETAG,
+        f"W/{ETAG}",
+        f'"other", {ETAG}',
+        f'"other",W/{ETAG} ',
+        "*",
+        " * ",
+    ],
+)
+def test_etag_matches(if_none_match: str) -> None:
+    assert etag_matches(make_request(if_none_match), ETAG)
+
+
+@pytest.mark.parametrize("if_none_match", [None, "", '"other"', ETAG.strip('"')])
+def test_etag_does_not_match(if_none_match: str | None) -> None:
+    assert not etag_matches(make_request(if_none_match), ETAG)
@@ -0,0 +1,300 @@
+"""End-to-end load test for the auth and user endpoints.
+
+Boots ``create_app()`` in-process (or targets ``--base-url``) against the
+database configured in ``.env``, seeds users, drives each workload with a
+fixed concurrency and prints per-endpoint throughput and latency as JSON.
+
+    docker compose up -d db && alembic upgrade head
+    BROKER=stub python -m tests.load.run --users 1000 --requests 2000 --concurrency 50
+
+``BROKER=stub`` keeps the signup verification messages in memory; with the
+default Redis broker, ``docker compose up -d db redis`` instead.
+
+Seeded users live under the ``@loadtest.example.com`` domain and are removed
+before and after the run.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from itertools import count
+from typing import Any
+
+import httpx
+from sqlalchemy import delete, insert
+from ulid import ULID
+
+from app.core.config import settings
+from app.core.database import get_async_session_factory
+from app.core.security import create_access_token, get_password_hash
+from app.main import create_app
+from app.models.user import User
+
+EMAIL_DOMAIN = "loadtest.example.com"
+PASSWORD = "load-test-password"
+
+WORKLOADS = ("signup", "login", "refresh", "me", "list", "patch")
+
+
+@dataclass
+class SeededUser:
+    id: str
+    email: str
+    access_token: str = ""
+    refresh_token: str = ""
+
+
+@dataclass
+class WorkloadResult:
+    latencies: list[float] = field(default_factory=list)
+    statuses: Counter[int] = field(default_factory=Counter)
+    errors: int = 0
+    elapsed: float = 0.0
+
+    def summary(self) -> dict[str, Any]:
+        latencies_ms = sorted(latency * 1000 for latency in self.latencies)
+        total = len(latencies_ms)
+
+        summary: dict[str, Any] = {
+            "requests": total,
+            "errors": self.errors,
+            "statuses": {str(code): n for code, n in sorted(self.statuses.items())},
+            "throughput_rps": round(total / self.elapsed, 2) if self.elapsed else 0.0,
+        }
+
+        if total >= 2:
+            cuts = statistics.quantiles(latencies_ms, n=100, method="inclusive")
+            summary["latency_ms"] = {
+                "p50": round(cuts[49], 3),
+                "p95": round(cuts[94], 3),
+                "p99": round(cuts[98], 3),
+                "max": round(latencies_ms[-1], 3),
+            }
+
+        return summary
+
+
+async def purge_load_test_users() -> None:
+    async with get_async_session_factory()() as session:
+        await session.execute(delete(User).where(User.email.like(f"%@{EMAIL_DOMAIN}")))
+        await session.commit()
+
+
+async def seed_users(n: int) -> list[SeededUser]:
+    # One hash for every seeded user; seeding should not be bcrypt-bound
+    hashed_password = get_password_hash(PASSWORD)
+    users = [
+        SeededUser(id=str(ULID()), email=f"seed-{i}@{EMAIL_DOMAIN}") for i in range(n)
+    ]
+
+    async with get_async_session_factory()() as session:
+        await session.execute(
+            insert(User),
+            [
+                {
+                    "id": user.id,
+                    "email": user.email,
+                    "first_name": "Load",
+                    "last_name": "Test",
+                    "hashed_password": hashed_password,
+                    "verified": True,
+                    "verification_key": None,
+                    # The first seeded user drives the admin-only workloads
+                    "is_admin": i == 0,
+                }
+                for i, user in enumerate(users)
+            ],
+        )
+        await session.commit()
+
+    return users
+
+
+def issue_tokens(users: list[SeededUser]) -> None:
+    # Tokens are minted directly so setup does not pay a bcrypt round per user
+    for user in users:
+        user.access_token = create_access_token(subject=user.id)
+        user.refresh_token = create_access_token(subject=user.id, type="refresh")
+
+
+def build_requests(
+    users: list[SeededUser],
+    run_id: str,
+) -> dict[str, Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]]:
+    admin = users[0]
+
+    def auth(user: SeededUser) -> dict[str, str]:
+        return {"Authorization": f"Bearer {user.access_token}"}
+
+    def pick(i: int) -> SeededUser:
+        return users[i % len(users)]
+
+    async def signup(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.post(
+            "/auth/signup",
+            json={
+                "email": f"signup-{run_id}-{i}@{EMAIL_DOMAIN}",
+                "password": PASSWORD,
+                "first_name": "Load",
+                "last_name": "Test",
+            },
+        )
+
+    async def login(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.post(
+            "/auth/login", json={"email": pick(i).email, "password": PASSWORD}
+        )
+
+    async def refresh(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        user = pick(i)
+        return await client.post(
+            "/auth/refresh",
+            json={"refresh_token": user.refresh_token},
+            headers=auth(user),
+        )
+
+    async def me(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.get("/users/me", headers=auth(pick(i)))
+
+    async def list_users(client: httpx.AsyncClient, i: int) -> httpx.Response:  # noqa: ARG001
+        return await client.get("/users/users", headers=auth(admin))
+
+    async def patch(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        user = pick(i)
+        return await client.patch(
+            f"/users/users/{user.id}",
+            json={"first_name": f"Load{i}", "last_name": "Test"},
+            headers=auth(user),
+        )
+
+    return {
+        "signup": signup,
+        "login": login,
+        "refresh": refresh,
+        "me": me,
+        "list": list_users,
+        "patch": patch,
+    }
+
+
+async def run_workload(
+    client: httpx.AsyncClient,
+    request: Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]],
+    total_requests: int,
+    concurrency: int,
+) -> WorkloadResult:
+    result = WorkloadResult()
+    counter = count()
+
+    async def worker() -> None:
+        while (i := next(counter)) < total_requests:
+            started_at = time.perf_counter()
+
+            try:
+                response = await request(client, i)
+            except httpx.HTTPError:
+                result.errors += 1
+                continue
+
+            result.latencies.append(time.perf_counter() - started_at)
+            result.statuses[response.status_code] += 1
+
+            if response.status_code >= 400:
+                result.errors += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - started_at
+
+    return result
+
+
+async def main(args: argparse.Namespace) -> dict[str, Any]:
+    if args.base_url:
+        transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport()
+        base_url = args.base_url
+    else:
+        # Every request comes from one client; measure the endpoints, not the
+        # auth rate limiter
+        settings.RATE_LIMIT_ENABLED = False
+        transport = httpx.ASGITransport(app=create_app())
+        base_url = "http://loadtest"
+
+    await purge_load_test_users()
+    users = await seed_users(args.users)
+    issue_tokens(users)
+
+    results: dict[str, Any] = {}
+
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url=base_url, timeout=args.timeout
+        ) as client:
+            requests = build_requests(users, run_id=str(ULID()).lower())
+
+            for name in args.workloads:
+                result = await run_workload(
+                    client, requests[name], args.requests, args.concurrency
+                )
+                results[name] = result.summary()
+    finally:
+        if not args.keep:
+            await purge_load_test_users()
+
+    return {
+        "started_at": datetime.now(UTC).isoformat(),
+        "config": {
+            "target": base_url,
+            "users": args.users,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+        },
+        "results": results,
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000, help="users to seed")
+    parser.add_argument(
+        "--requests", type=int, default=1000, help="requests per workload"
+    )
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument(
+        "--workloads",
+        nargs="+",
+        choices=WORKLOADS,
+        default=list(WORKLOADS),
+    )
+    parser.add_argument(
+        "--base-url",
+        help="target a running server instead of the in-process app",
+    )
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument(
+        "--keep", action="store_true", help="keep seeded users after the run"
+    )
+
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = asyncio.run(main(args))
+    rendered = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(rendered + "\n")
+
+    sys.stdout.write(rendered + "\n")